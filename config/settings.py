@@ -18,6 +18,7 @@ class Settings(BaseSettings):
     
     # PDF Configuration
     PDF_PATH: str = str(BASE_DIR / "USCODE-2011-title18.pdf")
+    PDF_BACKEND: str = "pymupdf"  # Options: "pymupdf", "pdfplumber" (table-heavy PDFs)
     
     # Chunking configuration
     CHUNK_SIZE: int = 500  # Characters per chunk
@@ -28,11 +29,14 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"  # Fast, lightweight
     EMBEDDING_DIMENSION: int = 384  # MiniLM dimension
     EMBEDDING_BATCH_SIZE: int = 32
+    INDEX_EMBEDDING_BATCH_SIZE: int = 64  # Batch size when embedding chunks in build_index
+    EMBEDDING_DTYPE: str = "bfloat16"  # Autocast dtype for GPU embedding ("float32" to disable)
     
     # Vector store configuration
     VECTOR_STORE_TYPE: str = "chroma"  # Options: "chroma", "faiss"
     VECTOR_STORE_PATH: Path = DATA_DIR / "vector_store"
     VECTOR_STORE_COLLECTION: str = "legal_documents"
+    VECTOR_QUANTIZATION: str = "none"  # Options: "none", "int8" (FAISS backend only)
     
     # Retrieval configuration
     RETRIEVAL_K: int = 5  # Number of chunks to retrieve
@@ -40,6 +44,9 @@ class Settings(BaseSettings):
     SIMILARITY_THRESHOLD: float = 0.3  # Minimum similarity score
     USE_HYBRID_RETRIEVAL: bool = True
     USE_METADATA_FILTERING: bool = True
+    RRF_K: int = 60  # Reciprocal Rank Fusion constant for hybrid retrieval
+    BM25_K1: float = 1.5  # BM25 term-frequency saturation
+    BM25_B: float = 0.75  # BM25 document-length normalization
     
     # Query configuration
     QUERY_EXPANSION_ENABLED: bool = True
@@ -49,8 +56,12 @@ class Settings(BaseSettings):
     LLM_MODEL: str = "gpt-4"  # Options: "gpt-4", "gpt-3.5-turbo"
     LLM_TEMPERATURE: float = 0.3  # Lower for more consistent legal answers
     LLM_MAX_TOKENS: int = 2000
+    LLM_MAX_CONCURRENCY: int = 8  # Max simultaneous LLM requests in generate_answer_batch
     OPENAI_API_KEY: Optional[str] = None
     
+    # Conversation configuration
+    CONVERSATION_HISTORY_MAX: int = 200  # Most recent turns kept per consultation
+    
     # API configuration
     API_HOST: str = "127.0.0.1"
     API_PORT: int = 8000
@@ -59,9 +70,12 @@ class Settings(BaseSettings):
     
     # Database configuration
     DB_PATH: Path = DATA_DIR / "chat_history.db"
+    LOG_BATCH_SIZE: int = 128  # Max rows per chat-history/feedback insert batch
+    LOG_FLUSH_INTERVAL: float = 0.5  # Seconds to wait for a batch to fill
     
     # Processing configuration
     NUM_WORKERS: int = 4
+    INDEX_FLUSH_SIZE: int = 1024  # Chunks embedded and indexed per batch in build_index
     CACHE_EMBEDDINGS: bool = True
     
     # Legal document specific patterns
@@ -3,11 +3,22 @@ Metadata extraction from legal documents using NER and regex patterns
 """
 import logging
 import re
+from collections import Counter
+from itertools import repeat
 from typing import Dict, Any, List, Set
 import spacy
 
 logger = logging.getLogger(__name__)
 
+# Fine amounts and prison/probation terms
+_PUNISHMENT_AMOUNT_RE = re.compile(r"\$\d+(?:,\d{3})*|\d+\s*(?:years?|months?|days?)")
+
+# Section references: § 2113, § 2113.1, 18 U.S.C. § 2113
+_SECTION_REFERENCE_RES = (
+    re.compile(r"(?:\d+\s+U\.S\.C\.?)?\s*§\s*(\d+(?:\.\d+)?)"),
+    re.compile(r"18\s+U\.S\.C\.?\s+(?:§\s*)?\d+"),
+)
+
 
 class MetadataExtractor:
     """Extract structured metadata from legal document chunks"""
@@ -51,30 +62,63 @@ class MetadataExtractor:
         if chunk_metadata is None:
             chunk_metadata = {}
         
-        # Extract various metadata types
-        chunk_metadata["entities"] = self._extract_entities(chunk_text)
-        chunk_metadata["crime_types"] = self._extract_crime_types(chunk_text)
-        chunk_metadata["punishment_types"] = self._extract_punishment_types(chunk_text)
-        chunk_metadata["legal_concepts"] = self._extract_legal_concepts(chunk_text)
-        chunk_metadata["section_references"] = self._extract_section_references(chunk_text)
-        chunk_metadata["keywords"] = self._extract_keywords(chunk_text)
-        chunk_metadata["text_type"] = self._classify_text_type(chunk_text)
+        doc = self.nlp(chunk_text) if self.nlp else None
+        chunk_metadata.update(self._build_metadata(chunk_text, doc))
         
         return chunk_metadata
     
-    def _extract_entities(self, text: str) -> List[Dict[str, str]]:
+    def extract_metadata_batch(self, chunks: List[Dict[str, Any]], batch_size: int = 64) -> List[Dict[str, Any]]:
+        """Extract metadata for many chunks at once
+        
+        Texts go through spaCy in batches via nlp.pipe, and each parsed doc
+        serves both entity and keyword extraction.
+        
+        Args:
+            chunks: Chunk dictionaries with a "text" key
+            batch_size: Number of texts per spaCy batch
+            
+        Returns:
+            One new metadata dictionary per chunk, in input order
+        """
+        texts = [chunk["text"] for chunk in chunks]
+        docs = self.nlp.pipe(texts, batch_size=batch_size) if self.nlp else repeat(None)
+        
+        return [self._build_metadata(text, doc) for text, doc in zip(texts, docs)]
+    
+    def _build_metadata(self, text: str, doc: Any) -> Dict[str, Any]:
+        """Build the metadata dictionary for one chunk
+        
+        Args:
+            text: Text of the chunk
+            doc: Parsed spaCy doc for the text, or None without a model
+            
+        Returns:
+            Metadata dictionary
+        """
+        text_lower = text.lower()
+        
+        return {
+            "entities": self._extract_entities(doc),
+            "crime_types": self._extract_crime_types(text_lower),
+            "punishment_types": self._extract_punishment_types(text, text_lower),
+            "legal_concepts": self._extract_legal_concepts(text_lower),
+            "section_references": self._extract_section_references(text),
+            "keywords": self._extract_keywords(doc),
+            "text_type": self._classify_text_type(text_lower),
+        }
+    
+    def _extract_entities(self, doc: Any) -> List[Dict[str, str]]:
         """Extract named entities using NER
         
         Args:
-            text: Text to analyze
+            doc: Parsed spaCy doc, or None
             
         Returns:
             List of entities with types
         """
-        if not self.nlp:
+        if doc is None:
             return []
         
-        doc = self.nlp(text)
         entities = []
         
         for ent in doc.ents:
@@ -89,64 +133,44 @@ class MetadataExtractor:
         
         return entities
     
-    def _extract_crime_types(self, text: str) -> List[str]:
+    def _extract_crime_types(self, text_lower: str) -> List[str]:
         """Extract crime type references
         
         Args:
-            text: Text to analyze
+            text_lower: Lowercased text to analyze
             
         Returns:
             List of identified crime types
         """
-        text_lower = text.lower()
-        crimes = []
-        
-        for crime in self.CRIME_KEYWORDS:
-            if crime in text_lower:
-                crimes.append(crime)
-        
-        return list(set(crimes))  # Remove duplicates
+        return [crime for crime in self.CRIME_KEYWORDS if crime in text_lower]
     
-    def _extract_punishment_types(self, text: str) -> List[str]:
+    def _extract_punishment_types(self, text: str, text_lower: str) -> List[str]:
         """Extract punishment/penalty references
         
         Args:
             text: Text to analyze
+            text_lower: Lowercased text
             
         Returns:
             List of identified punishment types
         """
-        text_lower = text.lower()
-        punishments = []
-        
-        for punishment in self.PUNISHMENT_KEYWORDS:
-            if punishment in text_lower:
-                punishments.append(punishment)
+        punishments = {p for p in self.PUNISHMENT_KEYWORDS if p in text_lower}
         
         # Extract specific numbers (fines, years)
-        numbers = re.findall(r"\$\d+(?:,\d{3})*|\d+\s*(?:years?|months?|days?)", text)
-        if numbers:
-            punishments.extend(numbers)
+        punishments.update(_PUNISHMENT_AMOUNT_RE.findall(text))
         
-        return list(set(punishments))
+        return list(punishments)
     
-    def _extract_legal_concepts(self, text: str) -> List[str]:
+    def _extract_legal_concepts(self, text_lower: str) -> List[str]:
         """Extract key legal concepts
         
         Args:
-            text: Text to analyze
+            text_lower: Lowercased text to analyze
             
         Returns:
             List of legal concepts
         """
-        text_lower = text.lower()
-        concepts = []
-        
-        for keyword in self.LEGAL_PROCEDURE_KEYWORDS:
-            if keyword in text_lower:
-                concepts.append(keyword)
-        
-        return list(set(concepts))
+        return [keyword for keyword in self.LEGAL_PROCEDURE_KEYWORDS if keyword in text_lower]
     
     def _extract_section_references(self, text: str) -> List[str]:
         """Extract legal section references
@@ -157,34 +181,25 @@ class MetadataExtractor:
         Returns:
             List of section references
         """
-        # Pattern: § 2113, § 2113.1, 18 U.S.C. § 2113
-        patterns = [
-            r"(?:\d+\s+U\.S\.C\.?)?\s*§\s*(\d+(?:\.\d+)?)",
-            r"18\s+U\.S\.C\.?\s+(?:§\s*)?\d+",
-        ]
-        
         references = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            references.extend(matches)
+        for pattern in _SECTION_REFERENCE_RES:
+            references.extend(pattern.findall(text))
         
         return list(set(references))
     
-    def _extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
+    def _extract_keywords(self, doc: Any, top_n: int = 10) -> List[str]:
         """Extract top keywords from text
         
         Args:
-            text: Text to analyze
+            doc: Parsed spaCy doc, or None
             top_n: Number of top keywords to return
             
         Returns:
             List of keywords
         """
-        if not self.nlp:
+        if doc is None:
             return []
         
-        doc = self.nlp(text)
-        
         # Extract nouns and adjectives
         keywords = []
         for token in doc:
@@ -193,22 +208,19 @@ class MetadataExtractor:
                     keywords.append(token.text.lower())
         
         # Count frequencies
-        from collections import Counter
         freq = Counter(keywords)
         
         return [word for word, _ in freq.most_common(top_n)]
     
-    def _classify_text_type(self, text: str) -> str:
+    def _classify_text_type(self, text_lower: str) -> str:
         """Classify the type of text (definition, punishment, etc.)
         
         Args:
-            text: Text to analyze
+            text_lower: Lowercased text to analyze
             
         Returns:
             Classification string
         """
-        text_lower = text.lower()
-        
         if "definition" in text_lower or "means" in text_lower:
             return "definition"
         elif any(word in text_lower for word in ["prison", "fine", "penalty", "imprisonment"]):
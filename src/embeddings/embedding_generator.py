@@ -3,6 +3,7 @@ Embedding generation using sentence transformers
 """
 import logging
 import numpy as np
+from contextlib import ExitStack
 from typing import List, Tuple
 from sentence_transformers import SentenceTransformer
 from config.settings import settings
@@ -46,12 +47,14 @@ class EmbeddingGenerator:
             logger.error(f"Error embedding text: {e}")
             return np.zeros(self.embedding_dim)
     
-    def embed_texts(self, texts: List[str], batch_size: int = None) -> List[np.ndarray]:
+    def embed_texts(self, texts: List[str], batch_size: int = None, dtype: str = None) -> List[np.ndarray]:
         """Generate embeddings for multiple texts
         
         Args:
             texts: List of texts to embed
             batch_size: Batch size for encoding (default from settings)
+            dtype: Autocast dtype for the forward pass on CUDA ("bfloat16",
+                "float16"); None or "float32" runs in full precision
             
         Returns:
             List of embedding vectors
@@ -61,21 +64,51 @@ class EmbeddingGenerator:
         
         batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
         
-        try:
-            logger.info(f"Embedding {len(texts)} texts with batch size {batch_size}")
-            embeddings = self.model.encode(
-                texts,
-                batch_size=batch_size,
-                convert_to_numpy=True,
-                show_progress_bar=True
-            )
+        # Set up precision outside the zero-vector fallback below, so a bad
+        # dtype or device setup fails loudly instead of yielding empty vectors
+        with self._inference_context(dtype):
+            try:
+                logger.info(f"Embedding {len(texts)} texts with batch size {batch_size}")
+                # encode() sorts texts by length before batching to keep padding low
+                embeddings = self.model.encode(
+                    texts,
+                    batch_size=batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=True
+                )
+                
+                logger.info(f"Successfully embedded {len(texts)} texts")
+                return [emb for emb in embeddings.astype(np.float32, copy=False)]
             
-            logger.info(f"Successfully embedded {len(texts)} texts")
-            return [emb for emb in embeddings]
+            except Exception as e:
+                logger.error(f"Error embedding texts: {e}")
+                return [np.zeros(self.embedding_dim) for _ in texts]
+    
+    def _inference_context(self, dtype: str = None):
+        """Build the context for a batched forward pass
         
-        except Exception as e:
-            logger.error(f"Error embedding texts: {e}")
-            return [np.zeros(self.embedding_dim) for _ in texts]
+        Runs under torch.inference_mode(), plus CUDA autocast to the requested
+        reduced precision when the model is on a GPU. bfloat16 falls back to
+        float16 on GPUs without bf16 support.
+        
+        Args:
+            dtype: Autocast dtype name, or None for full precision
+            
+        Returns:
+            Context manager wrapping the forward pass
+        """
+        import torch
+        
+        with ExitStack() as stack:
+            stack.enter_context(torch.inference_mode())
+            
+            if dtype and dtype != "float32" and self.model.device.type == "cuda":
+                if dtype == "bfloat16" and not torch.cuda.is_bf16_supported():
+                    logger.warning("GPU does not support bfloat16, embedding in float16")
+                    dtype = "float16"
+                stack.enter_context(torch.autocast("cuda", dtype=getattr(torch, dtype)))
+            
+            return stack.pop_all()
     
     def similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """Calculate cosine similarity between two embeddings
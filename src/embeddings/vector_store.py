@@ -29,6 +29,7 @@ class VectorStore:
         self.store = None
         self.metadata_store = {}  # Local store for metadata
         self.metadata_db_path = self.store_path / f"{self.collection_name}_metadata.json"
+        self.build_marker_path = self.store_path / f"{self.collection_name}.building"
         
         logger.info(f"Initializing {self.store_type} vector store at {self.store_path}")
         self._initialize_store()
@@ -78,12 +79,15 @@ class VectorStore:
             # Create empty index (will be sized on first insert)
             return None
     
-    def add_documents(self, documents: List[Dict[str, Any]], embeddings: List[np.ndarray]) -> bool:
+    def add_documents(self, documents: List[Dict[str, Any]], embeddings: List[np.ndarray],
+                      persist: bool = True) -> bool:
         """Add documents with embeddings to the store
         
         Args:
             documents: List of document dictionaries with 'text' and other metadata
             embeddings: List of embedding vectors
+            persist: Write the metadata file (and FAISS index) now; batch
+                loaders pass False and call persist() once at the end
             
         Returns:
             True if successful
@@ -94,26 +98,85 @@ class VectorStore:
         
         try:
             if self.store_type.lower() == "chroma":
-                return self._add_to_chroma(documents, embeddings)
+                added = self._add_to_chroma(documents, embeddings)
             elif self.store_type.lower() == "faiss":
-                return self._add_to_faiss(documents, embeddings)
+                added = self._add_to_faiss(documents, embeddings)
+            else:
+                return False
+            
+            if added and persist:
+                self.persist()
+            return added
         except Exception as e:
             logger.error(f"Error adding documents: {e}")
             return False
     
+    def persist(self):
+        """Write the metadata store and FAISS index to disk"""
+        self._save_metadata()
+        
+        if self.store_type.lower() == "faiss" and self.store is not None:
+            import faiss
+            index_path = self.store_path / f"{self.collection_name}.index"
+            faiss.write_index(self.store, str(index_path))
+    
+    def begin_build(self):
+        """Mark an index build as in progress
+        
+        The marker stays on disk until finish_build(), so a build that
+        crashes or fails part-way is detected by build_interrupted().
+        """
+        self.build_marker_path.parent.mkdir(parents=True, exist_ok=True)
+        self.build_marker_path.touch()
+    
+    def finish_build(self):
+        """Persist the store and clear the in-progress marker"""
+        self.persist()
+        self.build_marker_path.unlink(missing_ok=True)
+    
+    def build_interrupted(self) -> bool:
+        """Check whether an index build started but never finished
+        
+        Returns:
+            True if the store may hold a partial index
+        """
+        return self.build_marker_path.exists()
+    
+    def reset(self):
+        """Remove all documents, metadata and the build marker"""
+        
+        if self.store_type.lower() == "chroma":
+            try:
+                self.store.delete_collection(self.collection_name)
+            except Exception as e:
+                logger.debug(f"No collection to delete: {e}")
+            self.collection = self.store.get_or_create_collection(
+                name=self.collection_name,
+                metadata={"hnsw:space": "cosine"}
+            )
+        elif self.store_type.lower() == "faiss":
+            self.store = None
+            (self.store_path / f"{self.collection_name}.index").unlink(missing_ok=True)
+        
+        self.metadata_store = {}
+        self.metadata_db_path.unlink(missing_ok=True)
+        self.build_marker_path.unlink(missing_ok=True)
+        logger.info(f"Reset {self.store_type} vector store")
+    
     def _add_to_chroma(self, documents: List[Dict[str, Any]], embeddings: List[np.ndarray]) -> bool:
         """Add documents to Chroma with proper batching"""
         try:
             # Chroma has a batch size limit, so batch the additions
             batch_size = 5000  # Conservative batch size for Chroma
             total_added = 0
+            offset = self.collection.count()  # Continue ids after earlier additions
             
             for i in range(0, len(documents), batch_size):
                 batch_docs = documents[i:i+batch_size]
                 batch_embeddings = embeddings[i:i+batch_size]
                 batch_end_idx = i + len(batch_docs)
                 
-                ids = [f"{self.collection_name}_{j}" for j in range(i, batch_end_idx)]
+                ids = [f"{self.collection_name}_{j}" for j in range(offset + i, offset + batch_end_idx)]
                 
                 # Separate embeddings and metadata
                 embedding_lists = [emb.tolist() for emb in batch_embeddings]
@@ -136,7 +199,7 @@ class VectorStore:
                 logger.info(f"Added batch {i//batch_size + 1}: {len(batch_docs)} documents to Chroma (total: {total_added})")
             
             logger.info(f"Successfully added all {total_added} documents to Chroma")
-            self._save_metadata(documents)
+            self._add_metadata(documents)
             return True
         
         except Exception as e:
@@ -154,31 +217,57 @@ class VectorStore:
             if self.store is None:
                 # Create new index
                 dim = embeddings_array.shape[1]
-                self.store = faiss.IndexFlatL2(dim)
+                self.store = self._new_faiss_index(dim)
             
-            # Add vectors
-            self.store.add(embeddings_array)
+            if isinstance(self.store, faiss.IndexScalarQuantizer):
+                # Quantized indexes expect unit vectors (see _new_faiss_index)
+                faiss.normalize_L2(embeddings_array)
             
-            # Save index
-            index_path = self.store_path / f"{self.collection_name}.index"
-            faiss.write_index(self.store, str(index_path))
+            # Add vectors (written to disk by persist())
+            self.store.add(embeddings_array)
             
             logger.info(f"Added {len(documents)} documents to FAISS")
-            self._save_metadata(documents)
+            self._add_metadata(documents)
             return True
         
         except Exception as e:
             logger.error(f"Error adding to FAISS: {e}")
             return False
     
+    def _new_faiss_index(self, dim: int):
+        """Create an empty FAISS index for the configured quantization
+        
+        "int8" stores each dimension as one byte (4x smaller than float32)
+        and scores L2 distances directly on the quantized codes. Vectors are
+        unit-normalized before they are added, so every component lies in
+        [-1, 1]; the quantizer is trained on that fixed range rather than on
+        whichever batch arrives first, and nothing is clamped later. On unit
+        vectors L2 ranking equals cosine ranking.
+        
+        Args:
+            dim: Embedding dimension
+            
+        Returns:
+            FAISS index
+        """
+        import faiss
+        
+        if settings.VECTOR_QUANTIZATION.lower() == "int8":
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+            index.train(np.stack([-np.ones(dim), np.ones(dim)]).astype("float32"))
+            return index
+        return faiss.IndexFlatL2(dim)
+    
     def search(self, query_embedding: np.ndarray, k: int = 5, 
-               filter_dict: Dict[str, Any] = None) -> List[Tuple[Dict[str, Any], float]]:
+               filter_dict: Dict[str, Any] = None,
+               raise_errors: bool = False) -> List[Tuple[Dict[str, Any], float]]:
         """Search for similar documents
         
         Args:
             query_embedding: Query embedding vector
             k: Number of results to return
             filter_dict: Optional metadata filters
+            raise_errors: Raise search errors instead of returning no results
             
         Returns:
             List of (document, similarity_score) tuples
@@ -189,83 +278,78 @@ class VectorStore:
             elif self.store_type.lower() == "faiss":
                 return self._search_faiss(query_embedding, k)
         except Exception as e:
+            if raise_errors:
+                raise
             logger.error(f"Error searching: {e}")
             return []
     
     def _search_chroma(self, query_embedding: np.ndarray, k: int = 5,
                       filter_dict: Dict[str, Any] = None) -> List[Tuple[Dict[str, Any], float]]:
         """Search in Chroma"""
-        try:
-            results = self.collection.query(
-                query_embeddings=[query_embedding.tolist()],
-                n_results=k,
-                where=filter_dict if filter_dict else None
-            )
+        results = self.collection.query(
+            query_embeddings=[query_embedding.tolist()],
+            n_results=k,
+            where=filter_dict if filter_dict else None
+        )
+        
+        output = []
+        for i, doc_id in enumerate(results.get("ids", [[]])[0]):
+            distance = results.get("distances", [[]])[0][i] if results.get("distances") else 0
+            similarity = 1 - (distance / 2)  # Convert distance to similarity
             
-            output = []
-            for i, doc_id in enumerate(results.get("ids", [[]])[0]):
-                distance = results.get("distances", [[]])[0][i] if results.get("distances") else 0
-                similarity = 1 - (distance / 2)  # Convert distance to similarity
-                
-                metadata = results.get("metadatas", [[]])[0][i] if results.get("metadatas") else {}
-                text = results.get("documents", [[]])[0][i] if results.get("documents") else ""
-                
-                doc = {"text": text, **metadata}
-                output.append((doc, similarity))
+            metadata = results.get("metadatas", [[]])[0][i] if results.get("metadatas") else {}
+            text = results.get("documents", [[]])[0][i] if results.get("documents") else ""
             
-            return output
-        except Exception as e:
-            logger.error(f"Error searching Chroma: {e}")
-            return []
+            doc = {"text": text, **metadata}
+            output.append((doc, similarity))
+        
+        return output
     
     def _search_faiss(self, query_embedding: np.ndarray, k: int = 5) -> List[Tuple[Dict[str, Any], float]]:
         """Search in FAISS"""
-        try:
-            import faiss
-            
-            query_array = query_embedding.astype('float32').reshape(1, -1)
-            distances, indices = self.store.search(query_array, k)
-            
-            output = []
-            for idx, distance in zip(indices[0], distances[0]):
-                if idx >= 0:  # Valid result
-                    # Convert L2 distance to similarity
-                    similarity = 1.0 / (1.0 + float(distance))
-                    
-                    # Retrieve metadata from local store
-                    if idx < len(self.metadata_store):
-                        doc = self.metadata_store[idx]
-                        output.append((doc, similarity))
-            
-            return output
-        except Exception as e:
-            logger.error(f"Error searching FAISS: {e}")
+        if self.store is None:
+            # Nothing indexed yet
             return []
+        
+        query_array = query_embedding.astype('float32').reshape(1, -1)
+        distances, indices = self.store.search(query_array, k)
+        
+        output = []
+        for idx, distance in zip(indices[0], distances[0]):
+            if idx >= 0:  # Valid result
+                # Convert L2 distance to similarity
+                similarity = 1.0 / (1.0 + float(distance))
+                
+                # Retrieve metadata from local store
+                doc = self.metadata_store.get(str(idx))
+                if doc:
+                    output.append((doc, similarity))
+        
+        return output
     
-    def _save_metadata(self, documents: List[Dict[str, Any]]):
+    def _add_metadata(self, documents: List[Dict[str, Any]]):
+        """Append document metadata to the in-memory store
+        
+        Args:
+            documents: Documents just added, in index order
+        """
+        start_idx = len(self.metadata_store)
+        for i, doc in enumerate(documents):
+            # Convert numpy arrays and other non-serializable types
+            serializable_doc = {}
+            for k, v in doc.items():
+                if isinstance(v, np.ndarray):
+                    serializable_doc[k] = v.tolist()
+                else:
+                    serializable_doc[k] = v
+            
+            self.metadata_store[str(start_idx + i)] = serializable_doc
+    
+    def _save_metadata(self):
         """Save metadata locally for reference"""
         try:
             self.metadata_db_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Load existing metadata
-            if self.metadata_db_path.exists():
-                with open(self.metadata_db_path, "r") as f:
-                    self.metadata_store = json.load(f)
-            
-            # Append new documents
-            start_idx = len(self.metadata_store)
-            for i, doc in enumerate(documents):
-                # Convert numpy arrays and other non-serializable types
-                serializable_doc = {}
-                for k, v in doc.items():
-                    if isinstance(v, np.ndarray):
-                        serializable_doc[k] = v.tolist()
-                    else:
-                        serializable_doc[k] = v
-                
-                self.metadata_store[str(start_idx + i)] = serializable_doc
-            
-            # Save to disk
             with open(self.metadata_db_path, "w") as f:
                 json.dump(self.metadata_store, f, indent=2)
         
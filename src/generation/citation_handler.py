@@ -19,6 +19,14 @@ class CitationHandler:
         "cfr": r"(\d+)\s+C\.F\.R\.?\s+(?:§\s*)?(\d+(?:\.\d+)?)",
     }
     
+    # Compiled once; the literal each pattern cannot match without lets a
+    # plain substring check skip the regex scan entirely. The patterns stay
+    # Unicode-aware so non-breaking spaces around "§" still match \s
+    _USC_RE = re.compile(CITATION_PATTERNS["usc"])
+    _CFR_RE = re.compile(CITATION_PATTERNS["cfr"])
+    _USC_LITERAL = "U.S.C"
+    _CFR_LITERAL = "C.F.R"
+    
     @staticmethod
     def extract_citations(text: str) -> List[Dict[str, Any]]:
         """Extract all citations from text
@@ -31,8 +39,14 @@ class CitationHandler:
         """
         citations = []
         
+        if not text:
+            return citations
+        
         # Extract USC citations
-        usc_matches = re.finditer(CitationHandler.CITATION_PATTERNS["usc"], text)
+        if CitationHandler._USC_LITERAL in text:
+            usc_matches = CitationHandler._USC_RE.finditer(text)
+        else:
+            usc_matches = ()
         for match in usc_matches:
             citations.append({
                 "type": "usc",
@@ -44,7 +58,10 @@ class CitationHandler:
             })
         
         # Extract CFR citations
-        cfr_matches = re.finditer(CitationHandler.CITATION_PATTERNS["cfr"], text)
+        if CitationHandler._CFR_LITERAL in text:
+            cfr_matches = CitationHandler._CFR_RE.finditer(text)
+        else:
+            cfr_matches = ()
         for match in cfr_matches:
             citations.append({
                 "type": "cfr",
@@ -3,19 +3,159 @@ Conversation Manager for attorney-like legal consultation flow
 Manages multi-turn conversations with greeting, detail gathering, consent, and analysis
 """
 import logging
+import functools
+from collections import deque
 from typing import Dict, List, Any, Tuple
 from datetime import datetime
 import json
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Banner rules, built once at import
+_RULE = "=" * 80
+_DIVIDER = "-" * 80
+
+
+# Static responses are built on first use and cached thereafter
+@functools.lru_cache(maxsize=None)
+def _response_greeting() -> str:
+    return (
+        _RULE + "\n"
+        "⚖️  FEDERAL CRIMINAL LAW CONSULTATION\n"
+        + _RULE + "\n\n"
+        "Good day. I'm your legal consultation assistant, specialized in federal criminal law\n"
+        "under Title 18 of the United States Code.\n\n"
+        "I'm here to help you understand the legal implications of your situation and provide\n"
+        "comprehensive analysis based on applicable federal statutes.\n\n"
+        "To provide you with accurate and thorough legal assessment, I'll need to gather some\n"
+        "details about your situation. This conversation will be professional, confidential,\n"
+        "and focused on helping you understand the relevant legal framework.\n\n"
+        "Let's begin. Could you please describe the main issue or situation you'd like to\n"
+        "discuss? Please provide as much context as you feel comfortable sharing.\n"
+        + _RULE + "\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_initial_issue() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "Thank you for providing that information. I have a good understanding of the\n"
+        "initial issue. To conduct a thorough analysis, I need to gather additional details.\n\n"
+        "Let me ask you some clarifying questions:\n\n"
+        "1. TIMELINE: When did this incident occur? (Please provide specific dates or\n"
+        "   approximate timeframe - e.g., last week, 3 months ago, etc.)\n"
+        "   \n"
+        "   Type your response:\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_timeline() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "Thank you for that information. Understanding the timeline is crucial for\n"
+        "legal analysis.\n\n"
+        "2. PARTIES INVOLVED: Who are the parties involved in this situation?\n"
+        "   (e.g., yourself, other individuals, organizations, government agencies, etc.)\n"
+        "   Please describe their roles and relationships.\n"
+        "   \n"
+        "   Type your response:\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_parties() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "I understand the parties involved. This is important context.\n\n"
+        "3. HARM OR DAMAGE: What was the nature and extent of any harm, damage, or loss?\n"
+        "   (e.g., physical injury, property damage, financial loss, etc.)\n"
+        "   Please be as specific as possible about the impact.\n"
+        "   \n"
+        "   Type your response:\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_harm() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "Thank you for that important detail. The nature and extent of harm significantly\n"
+        "impacts legal analysis and potential penalties.\n\n"
+        "4. PRIOR INCIDENTS: Are there any prior incidents, complaints, or related matters?\n"
+        "   (e.g., previous conflicts, reported issues, ongoing disputes, etc.)\n"
+        "   Or type 'none' if there are no prior incidents.\n"
+        "   \n"
+        "   Type your response:\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_prior_incidents() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "I see. Prior incidents or patterns can be important for legal analysis.\n\n"
+        "5. EVIDENCE: What evidence or documentation do you have regarding this situation?\n"
+        "   (e.g., communications, witnesses, medical records, photographs, receipts, etc.)\n"
+        "   Or type 'none' if you don't have documentation.\n"
+        "   \n"
+        "   Type your response:\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_consent_proceed() -> str:
+    return (
+        "\n" + _RULE + "\n"
+        "GENERATING COMPREHENSIVE LEGAL ANALYSIS\n"
+        + _RULE + "\n\n"
+        "Based on your detailed case information, I am now analyzing applicable federal\n"
+        "statutes, case law precedents, and sentencing guidelines to provide you with a\n"
+        "thorough legal assessment.\n\n"
+        "Please review the following analysis carefully:\n\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_consent_more() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "Understood. Please provide the additional context or details you'd like to share.\n"
+        "This information will help me provide more accurate legal analysis.\n\n"
+        "Type your additional information:\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_consent_change() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "I understand you'd like to modify some information. You can provide the\n"
+        "corrected details now, or we can restart the consultation.\n\n"
+        "What would you like to change or clarify?\n"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _response_consent_unclear() -> str:
+    return (
+        "\n" + _DIVIDER + "\n"
+        "I didn't quite understand your response. Please clarify:\n\n"
+        "Do you want me to:\n"
+        "  • 'yes' - Proceed with the legal analysis now\n"
+        "  • 'more' - Provide additional details first\n"
+        "  • 'change' - Modify any previous information\n\n"
+    )
+
 
 class ConversationManager:
     """Manage attorney-like legal consultation conversation flow"""
     
     def __init__(self):
         """Initialize conversation manager"""
-        self.conversation_history = []
+        self.conversation_history = deque(maxlen=settings.CONVERSATION_HISTORY_MAX)
         self.case_details = {
             "initial_issue": "",
             "additional_context": [],
@@ -30,21 +170,7 @@ class ConversationManager:
         
     def get_greeting(self) -> str:
         """Return attorney-like greeting"""
-        return (
-            "="*80 + "\n"
-            "⚖️  FEDERAL CRIMINAL LAW CONSULTATION\n"
-            "="*80 + "\n\n"
-            "Good day. I'm your legal consultation assistant, specialized in federal criminal law\n"
-            "under Title 18 of the United States Code.\n\n"
-            "I'm here to help you understand the legal implications of your situation and provide\n"
-            "comprehensive analysis based on applicable federal statutes.\n\n"
-            "To provide you with accurate and thorough legal assessment, I'll need to gather some\n"
-            "details about your situation. This conversation will be professional, confidential,\n"
-            "and focused on helping you understand the relevant legal framework.\n\n"
-            "Let's begin. Could you please describe the main issue or situation you'd like to\n"
-            "discuss? Please provide as much context as you feel comfortable sharing.\n"
-            "="*80 + "\n"
-        )
+        return _response_greeting()
     
     def process_initial_issue(self, user_input: str) -> Tuple[str, bool]:
         """Process initial issue description and ask follow-up questions
@@ -63,18 +189,7 @@ class ConversationManager:
         })
         
         # Generate follow-up questions based on the issue
-        response = (
-            "\n" + "-"*80 + "\n"
-            "Thank you for providing that information. I have a good understanding of the\n"
-            "initial issue. To conduct a thorough analysis, I need to gather additional details.\n\n"
-            "Let me ask you some clarifying questions:\n\n"
-            "1. TIMELINE: When did this incident occur? (Please provide specific dates or\n"
-            "   approximate timeframe - e.g., last week, 3 months ago, etc.)\n"
-            "   \n"
-            "   Type your response:\n"
-        )
-        
-        return response, True
+        return _response_initial_issue(), True
     
     def process_timeline(self, user_input: str) -> Tuple[str, bool]:
         """Process timeline information and ask next question"""
@@ -85,18 +200,7 @@ class ConversationManager:
             "message": user_input
         })
         
-        response = (
-            "\n" + "-"*80 + "\n"
-            "Thank you for that information. Understanding the timeline is crucial for\n"
-            "legal analysis.\n\n"
-            "2. PARTIES INVOLVED: Who are the parties involved in this situation?\n"
-            "   (e.g., yourself, other individuals, organizations, government agencies, etc.)\n"
-            "   Please describe their roles and relationships.\n"
-            "   \n"
-            "   Type your response:\n"
-        )
-        
-        return response, True
+        return _response_timeline(), True
     
     def process_parties(self, user_input: str) -> Tuple[str, bool]:
         """Process parties information"""
@@ -107,17 +211,7 @@ class ConversationManager:
             "message": user_input
         })
         
-        response = (
-            "\n" + "-"*80 + "\n"
-            "I understand the parties involved. This is important context.\n\n"
-            "3. HARM OR DAMAGE: What was the nature and extent of any harm, damage, or loss?\n"
-            "   (e.g., physical injury, property damage, financial loss, etc.)\n"
-            "   Please be as specific as possible about the impact.\n"
-            "   \n"
-            "   Type your response:\n"
-        )
-        
-        return response, True
+        return _response_parties(), True
     
     def process_harm(self, user_input: str) -> Tuple[str, bool]:
         """Process harm/damage information"""
@@ -128,18 +222,7 @@ class ConversationManager:
             "message": user_input
         })
         
-        response = (
-            "\n" + "-"*80 + "\n"
-            "Thank you for that important detail. The nature and extent of harm significantly\n"
-            "impacts legal analysis and potential penalties.\n\n"
-            "4. PRIOR INCIDENTS: Are there any prior incidents, complaints, or related matters?\n"
-            "   (e.g., previous conflicts, reported issues, ongoing disputes, etc.)\n"
-            "   Or type 'none' if there are no prior incidents.\n"
-            "   \n"
-            "   Type your response:\n"
-        )
-        
-        return response, True
+        return _response_harm(), True
     
     def process_prior_incidents(self, user_input: str) -> Tuple[str, bool]:
         """Process prior incidents information"""
@@ -150,17 +233,7 @@ class ConversationManager:
             "message": user_input
         })
         
-        response = (
-            "\n" + "-"*80 + "\n"
-            "I see. Prior incidents or patterns can be important for legal analysis.\n\n"
-            "5. EVIDENCE: What evidence or documentation do you have regarding this situation?\n"
-            "   (e.g., communications, witnesses, medical records, photographs, receipts, etc.)\n"
-            "   Or type 'none' if you don't have documentation.\n"
-            "   \n"
-            "   Type your response:\n"
-        )
-        
-        return response, True
+        return _response_prior_incidents(), True
     
     def process_evidence(self, user_input: str) -> Tuple[str, bool]:
         """Process evidence information and prepare for consent"""
@@ -173,16 +246,16 @@ class ConversationManager:
         
         # Now ask for consent before providing analysis
         response = (
-            "\n" + "="*80 + "\n"
+            "\n" + _RULE + "\n"
             "CASE INFORMATION SUMMARY\n"
-            "="*80 + "\n\n"
+            + _RULE + "\n\n"
             "Thank you for providing these comprehensive details. I now have a clear understanding\n"
             "of your situation:\n\n"
             f"• Initial Issue: {self.case_details['initial_issue'][:100]}...\n"
             f"• Timeline: {self.case_details['dates'][0][:50]}...\n"
             f"• Parties Involved: {self.case_details['parties_involved'][0][:50]}...\n"
             f"• Harm/Damage: {self.case_details['damages_or_harm'][:50]}...\n\n"
-            "="*80 + "\n\n"
+            + _RULE + "\n\n"
             "READY FOR LEGAL ANALYSIS\n\n"
             "I am now prepared to provide you with a comprehensive legal analysis and case\n"
             "assessment based on applicable federal criminal law (Title 18, U.S. Code).\n\n"
@@ -200,7 +273,7 @@ class ConversationManager:
             "  • 'yes' or 'proceed' - To receive the legal analysis now\n"
             "  • 'more' or 'additional' - If you have more details to share\n"
             "  • 'change' - If you'd like to modify something from your previous responses\n\n"
-            "="*80 + "\n"
+            + _RULE + "\n"
         )
         
         self.conversation_state = "consent"
@@ -224,74 +297,41 @@ class ConversationManager:
             self.user_ready_for_analysis = True
             self.conversation_state = "analysis"
             
-            response = (
-                "\n" + "="*80 + "\n"
-                "GENERATING COMPREHENSIVE LEGAL ANALYSIS\n"
-                "="*80 + "\n\n"
-                "Based on your detailed case information, I am now analyzing applicable federal\n"
-                "statutes, case law precedents, and sentencing guidelines to provide you with a\n"
-                "thorough legal assessment.\n\n"
-                "Please review the following analysis carefully:\n\n"
-            )
-            
-            return response, True  # Signal to proceed with analysis
+            return _response_consent_proceed(), True  # Signal to proceed with analysis
         
         elif user_input_lower in ['more', 'additional', 'yes more', 'more details']:
-            response = (
-                "\n" + "-"*80 + "\n"
-                "Understood. Please provide the additional context or details you'd like to share.\n"
-                "This information will help me provide more accurate legal analysis.\n\n"
-                "Type your additional information:\n"
-            )
-            
-            return response, False  # Don't provide analysis yet
+            return _response_consent_more(), False  # Don't provide analysis yet
         
         elif user_input_lower in ['change', 'modify', 'back', 'previous']:
-            response = (
-                "\n" + "-"*80 + "\n"
-                "I understand you'd like to modify some information. You can provide the\n"
-                "corrected details now, or we can restart the consultation.\n\n"
-                "What would you like to change or clarify?\n"
-            )
-            
-            return response, False  # Don't provide analysis yet
+            return _response_consent_change(), False  # Don't provide analysis yet
         
         else:
-            response = (
-                "\n" + "-"*80 + "\n"
-                "I didn't quite understand your response. Please clarify:\n\n"
-                "Do you want me to:\n"
-                "  • 'yes' - Proceed with the legal analysis now\n"
-                "  • 'more' - Provide additional details first\n"
-                "  • 'change' - Modify any previous information\n\n"
-            )
-            
-            return response, False
+            return _response_consent_unclear(), False
     
     def get_case_summary(self) -> str:
         """Return formatted case summary"""
         summary = (
-            "\n" + "="*80 + "\n"
+            "\n" + _RULE + "\n"
             "CASE DETAILS SUMMARY\n"
-            "="*80 + "\n\n"
+            + _RULE + "\n\n"
             f"INITIAL ISSUE:\n{self.case_details['initial_issue']}\n\n"
             f"TIMELINE:\n{self.case_details['dates'][0] if self.case_details['dates'] else 'Not specified'}\n\n"
             f"PARTIES INVOLVED:\n{self.case_details['parties_involved'][0] if self.case_details['parties_involved'] else 'Not specified'}\n\n"
             f"HARM/DAMAGE:\n{self.case_details['damages_or_harm']}\n\n"
             f"PRIOR INCIDENTS:\n{self.case_details['prior_incidents']}\n\n"
             f"EVIDENCE:\n{self.case_details['evidence'][0] if self.case_details['evidence'] else 'None'}\n\n"
-            "="*80 + "\n"
+            + _RULE + "\n"
         )
         
         return summary
     
     def get_conversation_history(self) -> List[Dict[str, Any]]:
         """Return conversation history"""
-        return self.conversation_history
+        return list(self.conversation_history)
     
     def reset_conversation(self):
         """Reset conversation for new case"""
-        self.conversation_history = []
+        self.conversation_history.clear()
         self.case_details = {
             "initial_issue": "",
             "additional_context": [],
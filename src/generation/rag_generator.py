@@ -1,12 +1,17 @@
 """
 RAG generation with LLM integration and citation handling
 """
+import asyncio
 import logging
+import re
 from typing import List, Dict, Any, Tuple
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Citations in generated answers (pattern: 18 U.S.C. § 2113)
+_CITATION_RE = re.compile(r"(?:18\s+)?U\.S\.C\.?\s+(?:§\s*)?(\d+(?:\.\d+)?(?:\s*\([a-zA-Z0-9]+\))?)")
+
 
 class RAGGenerator:
     """Generate answers using RAG with citations to legal documents"""
@@ -18,17 +23,19 @@ class RAGGenerator:
     def _initialize_llm(self):
         """Initialize the LLM based on settings"""
         try:
-            from openai import OpenAI
+            from openai import OpenAI, AsyncOpenAI
             
             api_key = settings.OPENAI_API_KEY
             if not api_key:
                 logger.warning("OPENAI_API_KEY not set, OpenAI features will be limited")
             
             self.client = OpenAI(api_key=api_key) if api_key else None
+            self.async_client = AsyncOpenAI(api_key=api_key) if api_key else None
             logger.info(f"Initialized LLM: {settings.LLM_MODEL}")
         except ImportError:
             logger.warning("OpenAI library not installed")
             self.client = None
+            self.async_client = None
     
     def generate_answer(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate answer using retrieved documents
@@ -44,46 +51,119 @@ class RAGGenerator:
             return self._generate_fallback_answer(query, retrieved_docs)
         
         try:
-            # Prepare context from retrieved documents
-            context = self._prepare_context(retrieved_docs)
-            
-            # Create prompt with legal instructions
-            prompt = self._create_legal_prompt(query, context)
-            
             # Call LLM
             response = self.client.chat.completions.create(
                 model=settings.LLM_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self._get_system_prompt()
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=self._build_messages(query, retrieved_docs),
                 temperature=settings.LLM_TEMPERATURE,
                 max_tokens=settings.LLM_MAX_TOKENS
             )
             
-            answer_text = response.choices[0].message.content
-            
-            # Extract and format citations
-            citations = self._extract_citations(answer_text, retrieved_docs)
-            
-            return {
-                "answer": answer_text,
-                "citations": citations,
-                "retrieved_docs_count": len(retrieved_docs),
-                "model": settings.LLM_MODEL,
-                "status": "success"
-            }
+            return self._format_answer(response, retrieved_docs)
         
         except Exception as e:
             logger.error(f"Error generating answer: {e}")
             return self._generate_fallback_answer(query, retrieved_docs)
     
+    async def generate_answer_batch(self, queries_and_docs: List[Tuple[str, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Generate answers for several independent queries concurrently
+        
+        Each query keeps its own context and LLM request; up to
+        settings.LLM_MAX_CONCURRENCY requests are in flight at once so their
+        network round-trips overlap without tripping API rate limits.
+        
+        Args:
+            queries_and_docs: List of (query, retrieved_docs) pairs
+            
+        Returns:
+            List of answer dictionaries, in the same order as the input
+        """
+        if not self.async_client:
+            return [self._generate_fallback_answer(query, docs) for query, docs in queries_and_docs]
+        
+        semaphore = asyncio.Semaphore(max(1, settings.LLM_MAX_CONCURRENCY))
+        
+        async def create(query: str, docs: List[Dict[str, Any]]) -> Any:
+            async with semaphore:
+                return await self.async_client.chat.completions.create(
+                    model=settings.LLM_MODEL,
+                    messages=self._build_messages(query, docs),
+                    temperature=settings.LLM_TEMPERATURE,
+                    max_tokens=settings.LLM_MAX_TOKENS
+                )
+        
+        responses = await asyncio.gather(
+            *[create(query, docs) for query, docs in queries_and_docs],
+            return_exceptions=True
+        )
+        
+        results = []
+        for (query, docs), response in zip(queries_and_docs, responses):
+            # Failures fall back per query, as in generate_answer. gather returns
+            # a cancelled request as CancelledError, which is a BaseException
+            if isinstance(response, BaseException):
+                logger.error(f"Error generating answer: {response!r}")
+                results.append(self._generate_fallback_answer(query, docs))
+                continue
+            
+            try:
+                results.append(self._format_answer(response, docs))
+            except Exception as e:
+                logger.error(f"Error generating answer: {e}")
+                results.append(self._generate_fallback_answer(query, docs))
+        
+        return results
+    
+    def _build_messages(self, query: str, retrieved_docs: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Build the chat messages for a query
+        
+        Args:
+            query: User query
+            retrieved_docs: List of retrieved document chunks
+            
+        Returns:
+            List of chat message dictionaries
+        """
+        # Prepare context from retrieved documents
+        context = self._prepare_context(retrieved_docs)
+        
+        # Create prompt with legal instructions
+        prompt = self._create_legal_prompt(query, context)
+        
+        return [
+            {
+                "role": "system",
+                "content": self._get_system_prompt()
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    
+    def _format_answer(self, response: Any, retrieved_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Format an LLM completion into an answer dictionary
+        
+        Args:
+            response: Chat completion response
+            retrieved_docs: Documents used as context
+            
+        Returns:
+            Dictionary with answer, citations, and metadata
+        """
+        answer_text = response.choices[0].message.content
+        
+        # Extract and format citations
+        citations = self._extract_citations(answer_text, retrieved_docs)
+        
+        return {
+            "answer": answer_text,
+            "citations": citations,
+            "retrieved_docs_count": len(retrieved_docs),
+            "model": settings.LLM_MODEL,
+            "status": "success"
+        }
+    
     def _get_system_prompt(self) -> str:
         """Get system prompt for legal document chatbot
         
@@ -141,16 +221,22 @@ Please provide a comprehensive, well-cited answer that:
         Returns:
             Formatted context string
         """
-        context_parts = []
-        
-        for doc in retrieved_docs:
-            text = doc.get("text", "")
-            section = doc.get("section", "Unknown")
-            source = doc.get("source", "Unknown")
-            
-            context_parts.append(f"[{section} - {source}]\n{text}\n")
-        
-        return "\n".join(context_parts)
+        # Append raw fragments and join once, avoiding a per-document f-string
+        parts = []
+        app = parts.append
+
+        for i, doc in enumerate(retrieved_docs):
+            if i:
+                app("\n")  # Blank line between documents
+            app("[")
+            app(str(doc.get("section", "Unknown")))
+            app(" - ")
+            app(str(doc.get("source", "Unknown")))
+            app("]\n")
+            app(str(doc.get("text", "")))
+            app("\n")
+
+        return "".join(parts)
     
     def _extract_citations(self, answer_text: str, retrieved_docs: List[Dict[str, Any]]) -> List[Dict[str, str]]:
         """Extract and verify citations from answer
@@ -162,15 +248,15 @@ Please provide a comprehensive, well-cited answer that:
         Returns:
             List of citation dictionaries
         """
-        import re
-        
-        # Find citations in answer (pattern: 18 U.S.C. § 2113)
-        citation_pattern = r"(?:18\s+)?U\.S\.C\.?\s+(?:§\s*)?(\d+(?:\.\d+)?(?:\s*\([a-zA-Z0-9]+\))?)"
-        citations = re.findall(citation_pattern, answer_text)
-        
-        # Create citation dictionaries with links to source docs
+        # Walk citations lazily, resolving each unique reference only once
+        seen = set()
         citation_list = []
-        for citation in citations:
+        for match in _CITATION_RE.finditer(answer_text):
+            citation = match.group(1)
+            if citation in seen:
+                continue
+            seen.add(citation)
+            
             # Find matching document
             matching_doc = None
             for doc in retrieved_docs:
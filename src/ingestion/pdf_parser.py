@@ -3,14 +3,69 @@ PDF Parser for legal documents
 Extracts text with metadata (page numbers, sections, references)
 """
 import logging
+import multiprocessing
 import re
-from typing import List, Dict, Any, Tuple
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Dict, Any, Tuple, Optional, Iterator
 from pathlib import Path
-import pypdf
-import pdfplumber
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Pattern for legal sections: § 2113, § 2113.1, etc.
+_SECTION_RE = re.compile(r"§\s*(\d+(?:\.\d+)?)")
+# Pattern for subsections: (a), (b), (1), (2), etc.
+_SUBSECTION_RE = re.compile(r"\(([a-zA-Z0-9]+)\)")
+
+# Pages extracted per worker task, and tasks queued per worker; together they
+# bound how many extracted pages wait in memory ahead of the consumer
+_PAGES_PER_TASK = 16
+_TASKS_PER_WORKER = 2
+
+# PDF handle and backend opened once per extraction worker process
+_worker_pdf = None
+_worker_backend = None
+
+
+def _open_pdf(pdf_path: str, backend: str):
+    """Open a PDF with the given backend ("pymupdf" or "pdfplumber")"""
+    if backend == "pymupdf":
+        import fitz
+        return fitz.open(pdf_path)
+    import pdfplumber
+    return pdfplumber.open(pdf_path)
+
+
+def _page_text(pdf, page_idx: int, backend: str) -> Optional[str]:
+    """Extract the text of one page from an open PDF"""
+    if backend == "pymupdf":
+        return pdf[page_idx].get_text("text")
+    return pdf.pages[page_idx].extract_text()
+
+
+def _init_page_worker(pdf_path: str, backend: str):
+    """Open the PDF once in each worker process"""
+    global _worker_pdf, _worker_backend
+    _worker_pdf = _open_pdf(pdf_path, backend)
+    _worker_backend = backend
+
+
+def _extract_pages(start: int, stop: int) -> List[Optional[str]]:
+    """Extract the text of pages [start, stop) in a worker process"""
+    return [_page_text(_worker_pdf, i, _worker_backend) for i in range(start, stop)]
+
+
+def _pool_context():
+    """Start method for worker pools
+    
+    Pools are created from a process that already runs logging and torch
+    threads, which fork() does not copy safely, so workers are started
+    with forkserver where available and spawn elsewhere.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
 
 class PDFParser:
     """Parse legal PDFs and extract structured text with metadata"""
@@ -26,7 +81,25 @@ class PDFParser:
             raise FileNotFoundError(f"PDF not found: {self.pdf_path}")
         
         self.document_title = self.pdf_path.stem
-        logger.info(f"Initialized PDFParser for {self.pdf_path}")
+        self.backend = self._select_backend()
+        logger.info(f"Initialized PDFParser for {self.pdf_path} ({self.backend})")
+    
+    def _select_backend(self) -> str:
+        """Pick the text extraction backend from settings
+        
+        PyMuPDF is preferred for plain-text extraction; pdfplumber is kept for
+        table-heavy PDFs and as a fallback when PyMuPDF is not installed.
+        
+        Returns:
+            "pymupdf" or "pdfplumber"
+        """
+        if settings.PDF_BACKEND.lower() == "pymupdf":
+            try:
+                import fitz  # noqa: F401
+                return "pymupdf"
+            except ImportError:
+                logger.warning("PyMuPDF not available, falling back to pdfplumber")
+        return "pdfplumber"
     
     def extract_text_with_metadata(self) -> List[Dict[str, Any]]:
         """Extract text from PDF with metadata
@@ -34,35 +107,108 @@ class PDFParser:
         Returns:
             List of dictionaries with keys: text, page_num, section, subsection
         """
-        pages_with_metadata = []
+        pages_with_metadata = list(self.iter_pages_with_metadata())
         
+        logger.info(f"Extracted {len(pages_with_metadata)} pages with metadata")
+        return pages_with_metadata
+    
+    def worker_pool(self, max_workers: int = None) -> ProcessPoolExecutor:
+        """Create a process pool whose workers have this PDF open
+        
+        The pool can also run other picklable work, such as page cleaning,
+        so one pool serves a whole ingestion run.
+        
+        Args:
+            max_workers: Number of worker processes (default settings.NUM_WORKERS)
+            
+        Returns:
+            ProcessPoolExecutor, to be used as a context manager
+        """
+        return ProcessPoolExecutor(
+            max_workers=max_workers or settings.NUM_WORKERS,
+            mp_context=_pool_context(),
+            initializer=_init_page_worker,
+            initargs=(str(self.pdf_path), self.backend)
+        )
+    
+    def iter_pages_with_metadata(self, executor: Executor = None) -> Iterator[Dict[str, Any]]:
+        """Extract text from PDF with metadata, yielding one page at a time
+        
+        Args:
+            executor: Pool from worker_pool() to extract pages on; by default
+                a pool is created for settings.NUM_WORKERS > 1
+        
+        Yields:
+            Dictionaries with keys: text, page_num, section, subsection
+        """
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                for page_num, page in enumerate(pdf.pages, 1):
-                    text = page.extract_text()
-                    if not text or text.strip() == "":
-                        continue
-                    
-                    # Extract section and subsection information
-                    section, subsection = self._extract_legal_references(text)
-                    
-                    pages_with_metadata.append({
-                        "text": text,
-                        "page_num": page_num,
-                        "section": section,
-                        "subsection": subsection,
-                        "document_title": self.document_title,
-                        "source": f"{self.document_title}:p{page_num}"
-                    })
-                    
-                    logger.debug(f"Extracted page {page_num} with section: {section}")
+            for page_num, text in enumerate(self._iter_page_texts(executor), 1):
+                if not text or text.strip() == "":
+                    continue
+                
+                # Extract section and subsection information
+                section, subsection = self._extract_legal_references(text)
+                
+                logger.debug(f"Extracted page {page_num} with section: {section}")
+                
+                yield {
+                    "text": text,
+                    "page_num": page_num,
+                    "section": section,
+                    "subsection": subsection,
+                    "document_title": self.document_title,
+                    "source": f"{self.document_title}:p{page_num}"
+                }
         
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {e}")
             raise
+    
+    def _iter_page_texts(self, executor: Executor = None) -> Iterator[Optional[str]]:
+        """Extract raw text for every page, in page order
         
-        logger.info(f"Extracted {len(pages_with_metadata)} pages with metadata")
-        return pages_with_metadata
+        Pages are independent, so extraction is spread over a process pool
+        of settings.NUM_WORKERS workers; a single worker extracts in-process.
+        
+        Args:
+            executor: Pool from worker_pool(), or None
+        
+        Yields:
+            Page texts (None for pages without a text layer)
+        """
+        num_workers = settings.NUM_WORKERS
+        
+        if executor is None and num_workers <= 1:
+            with _open_pdf(str(self.pdf_path), self.backend) as pdf:
+                num_pages = len(pdf) if self.backend == "pymupdf" else len(pdf.pages)
+                for i in range(num_pages):
+                    yield _page_text(pdf, i, self.backend)
+            return
+        
+        if executor is None:
+            with self.worker_pool(num_workers) as executor:
+                yield from self._iter_page_texts(executor)
+            return
+        
+        import pypdf
+        num_pages = len(pypdf.PdfReader(self.pdf_path).pages)
+        
+        # Submit page ranges in a bounded window rather than all at once, so
+        # extracted text never piles up far ahead of the consumer
+        window = max(1, num_workers) * _TASKS_PER_WORKER
+        pending = deque()
+        try:
+            for start in range(0, num_pages, _PAGES_PER_TASK):
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+                stop = min(start + _PAGES_PER_TASK, num_pages)
+                pending.append(executor.submit(_extract_pages, start, stop))
+            
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
     
     def _extract_legal_references(self, text: str) -> Tuple[str, str]:
         """Extract section and subsection numbers from text
@@ -73,16 +219,12 @@ class PDFParser:
         Returns:
             Tuple of (section, subsection)
         """
-        # Pattern for legal sections: § 2113, § 2113.1, etc.
-        section_pattern = r"§\s*(\d+(?:\.\d+)?)"
-        # Pattern for subsections: (a), (b), (1), (2), etc.
-        subsection_pattern = r"\(([a-zA-Z0-9]+)\)"
-        
-        sections = re.findall(section_pattern, text)
-        subsections = re.findall(subsection_pattern, text[:500])  # Look in first part
+        # Only the first match is needed, so stop scanning as soon as one is found
+        section_match = _SECTION_RE.search(text)
+        subsection_match = _SUBSECTION_RE.search(text, 0, 500)  # Look in first part
         
-        section = sections[0] if sections else "Unknown"
-        subsection = subsections[0] if subsections else ""
+        section = section_match.group(1) if section_match else "Unknown"
+        subsection = subsection_match.group(1) if subsection_match else ""
         
         return section, subsection
     
@@ -93,6 +235,7 @@ class PDFParser:
             Dictionary with document metadata
         """
         try:
+            import pypdf
             with pypdf.PdfReader(self.pdf_path) as reader:
                 num_pages = len(reader.pages)
                 metadata = reader.metadata
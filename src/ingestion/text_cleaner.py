@@ -7,6 +7,9 @@ from typing import List
 
 logger = logging.getLogger(__name__)
 
+# Control characters other than tab and newline, mapped to None for str.translate
+_CTRL_TRANS = dict.fromkeys([i for i in range(32) if i not in (9, 10)], None)
+
 
 class TextCleaner:
     """Clean and normalize text from legal documents"""
@@ -21,6 +24,31 @@ class TextCleaner:
         "emails": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b",
     }
     
+    # Compiled forms of PATTERNS, built once at class load
+    _PATTERNS = {
+        name: re.compile(pattern, re.MULTILINE if name == "line_numbers" else 0)
+        for name, pattern in PATTERNS.items()
+    }
+    
+    # Legal reference variants, matched together in a single scan
+    _LEGAL_REF_RE = re.compile(
+        r"(?P<usc>U\.?\s?S\.?\s?C\.?)"
+        r"|(?P<sect>&sect;|Sec\.|Section)"
+        r"|(?P<etseq>et\s*seq\.?)"
+    )
+    
+    # Replacement for each _LEGAL_REF_RE branch
+    _LEGAL_REF_REPL = {
+        "usc": "U.S.C.",
+        "sect": "§",
+        "etseq": "et seq.",
+    }
+    
+    @staticmethod
+    def _replace_match(match: re.Match, _repl=_LEGAL_REF_REPL) -> str:
+        """Replacement for a _LEGAL_REF_RE match, by branch name"""
+        return _repl[match.lastgroup]
+    
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean and normalize text
@@ -35,12 +63,12 @@ class TextCleaner:
             return ""
         
         # Remove page breaks and excessive whitespace
-        text = re.sub(TextCleaner.PATTERNS["page_breaks"], " ", text)
-        text = re.sub(TextCleaner.PATTERNS["multiple_spaces"], " ", text)
-        text = re.sub(TextCleaner.PATTERNS["extra_whitespace"], "\n\n", text)
+        text = TextCleaner._PATTERNS["page_breaks"].sub(" ", text)
+        text = TextCleaner._PATTERNS["multiple_spaces"].sub(" ", text)
+        text = TextCleaner._PATTERNS["extra_whitespace"].sub("\n\n", text)
         
         # Remove line numbers (common in PDFs)
-        text = re.sub(TextCleaner.PATTERNS["line_numbers"], "", text, flags=re.MULTILINE)
+        text = TextCleaner._PATTERNS["line_numbers"].sub("", text)
         
         # Strip leading/trailing whitespace
         text = text.strip()
@@ -57,16 +85,9 @@ class TextCleaner:
         Returns:
             Text with normalized references
         """
-        # Normalize "U.S.C." variations
-        text = re.sub(r"U\.?\s?S\.?\s?C\.?", "U.S.C.", text)
-        
-        # Normalize "§" symbol (section)
-        text = re.sub(r"&sect;|Sec\.|Section", "§", text)
-        
-        # Normalize "et seq." (and following)
-        text = re.sub(r"et\s*seq\.?", "et seq.", text)
-        
-        return text
+        # Normalize "U.S.C." variations, "§" symbol (section) and "et seq."
+        # (and following) in one pass
+        return TextCleaner._LEGAL_REF_RE.sub(TextCleaner._replace_match, text)
     
     @staticmethod
     def remove_artifacts(text: str) -> str:
@@ -79,13 +100,13 @@ class TextCleaner:
             Text without artifacts
         """
         # Remove URLs
-        text = re.sub(TextCleaner.PATTERNS["urls"], "", text)
+        text = TextCleaner._PATTERNS["urls"].sub("", text)
         
         # Remove emails
-        text = re.sub(TextCleaner.PATTERNS["emails"], "", text)
+        text = TextCleaner._PATTERNS["emails"].sub("", text)
         
         # Remove control characters
-        text = "".join(char for char in text if ord(char) >= 32 or char in '\n\t')
+        text = text.translate(_CTRL_TRANS)
         
         return text
     
@@ -99,6 +120,8 @@ class TextCleaner:
         Returns:
             Preprocessed text ready for chunking
         """
+        # The steps run in order: line numbers are only removed after
+        # whitespace has been collapsed, so "... \n18 U.S.C." keeps its "18"
         text = TextCleaner.clean_text(text)
         text = TextCleaner.remove_artifacts(text)
         text = TextCleaner.normalize_legal_references(text)
@@ -4,9 +4,14 @@ Coordinates all components: ingestion, chunking, embedding, retrieval, generatio
 """
 import logging
 import json
+import atexit
+import queue
+import threading
+import time
+from contextlib import nullcontext
 from typing import List, Dict, Any
 from pathlib import Path
-from tqdm import tqdm
+from types import SimpleNamespace
 import sqlite3
 from datetime import datetime
 
@@ -19,6 +24,22 @@ from src.generation import RAGGenerator, CitationHandler, AnalysisGenerator
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of the page stream in build_index
+_END_OF_PAGES = object()
+
+# Marks the end of the logging queue
+_END_OF_LOG = object()
+
+_INSERT_INTERACTION = """
+    INSERT INTO chat_history (session_id, query, answer, model, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_INSERT_FEEDBACK = """
+    INSERT INTO feedback (query, answer, rating, comment, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
 
 class RAGPipeline:
     """Complete RAG pipeline for legal documents"""
@@ -55,7 +76,10 @@ class RAGPipeline:
             settings.DATA_DIR.mkdir(parents=True, exist_ok=True)
             self.db_path = settings.DB_PATH
             
-            conn = sqlite3.connect(str(self.db_path))
+            # One long-lived connection shared by the logging methods
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
             cursor = conn.cursor()
             
             # Chat history table
@@ -83,13 +107,74 @@ class RAGPipeline:
                 )
             """)
             
-            conn.commit()
-            conn.close()
+            # Log rows are queued and written in batches by a background thread
+            self._log_conn = conn
+            self._log_queue = queue.Queue(maxsize=10000)
+            self._log_thread = threading.Thread(target=self._drain_log_queue, daemon=True)
+            self._log_thread.start()
+            atexit.register(self._close_log)
             logger.info(f"Database initialized at {self.db_path}")
         
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
     
+    def _drain_log_queue(self):
+        """Write queued log rows to SQLite in batches
+        
+        Collects up to LOG_BATCH_SIZE rows, or whatever arrives within
+        LOG_FLUSH_INTERVAL seconds, and inserts them in one transaction.
+        """
+        stopping = False
+        while not stopping:
+            item = self._log_queue.get()
+            if item is _END_OF_LOG:
+                break
+            
+            batch = [item]
+            deadline = time.monotonic() + settings.LOG_FLUSH_INTERVAL
+            while len(batch) < settings.LOG_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._log_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _END_OF_LOG:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._write_log_batch(batch)
+    
+    def _write_log_batch(self, batch: List[tuple]):
+        """Insert a batch of (statement, row) pairs in a single transaction
+        
+        Args:
+            batch: Queued (SQL statement, parameters) pairs
+        """
+        rows_by_statement = {}
+        for statement, row in batch:
+            rows_by_statement.setdefault(statement, []).append(row)
+        
+        try:
+            self._log_conn.execute("BEGIN")
+            for statement, rows in rows_by_statement.items():
+                self._log_conn.executemany(statement, rows)
+            self._log_conn.execute("COMMIT")
+            logger.debug(f"Wrote {len(batch)} log rows")
+        
+        except Exception as e:
+            if self._log_conn.in_transaction:
+                self._log_conn.execute("ROLLBACK")
+            logger.warning(f"Error writing log rows: {e}")
+    
+    def _close_log(self):
+        """Flush queued log rows and close the database connection"""
+        self._log_queue.put(_END_OF_LOG)
+        self._log_thread.join(timeout=5)
+        self._log_conn.close()
+    
     def build_index(self, force_rebuild: bool = False) -> bool:
         """Build the entire index from PDF
         
@@ -100,64 +185,194 @@ class RAGPipeline:
             True if successful
         """
         try:
-            # Check if index already exists
-            if self.vector_store.get_collection_size() > 0 and not force_rebuild:
-                logger.info("Index already exists, skipping build")
-                return True
+            if self.vector_store.build_interrupted():
+                logger.warning("Found a partial index from an unfinished build, discarding it")
+                self._reset_index()
+            elif self.vector_store.get_collection_size() > 0:
+                if not force_rebuild:
+                    logger.info("Index already exists, skipping build")
+                    return True
+                self._reset_index()
             
             logger.info("Starting index building process...")
+            self.vector_store.begin_build()
             
-            # Step 1: Extract documents from PDF
-            logger.info("Step 1: Extracting documents from PDF...")
-            pages_with_metadata = self.pdf_parser.extract_text_with_metadata()
-            logger.info(f"Extracted {len(pages_with_metadata)} pages")
-            
-            # Step 2: Clean and preprocess text
-            logger.info("Step 2: Cleaning and preprocessing text...")
-            for page in pages_with_metadata:
-                page["text"] = self.text_cleaner.preprocess_for_chunking(page["text"])
-            
-            # Step 3: Chunk documents semantically
-            logger.info("Step 3: Creating semantic chunks...")
-            all_chunks = []
-            for page in pages_with_metadata:
-                chunks = self.chunker.chunk_text(
-                    page["text"],
-                    metadata={
-                        "page_num": page["page_num"],
-                        "section": page["section"],
-                        "subsection": page["subsection"],
-                        "document_title": page["document_title"]
-                    }
-                )
-                all_chunks.extend(chunks)
-            
-            logger.info(f"Created {len(all_chunks)} chunks")
+            # Pages are extracted and cleaned on a producer thread while this
+            # thread chunks, embeds and indexes them in batches, so PDF work
+            # overlaps embedding and only one batch of chunks is held at a time
+            page_queue = queue.Queue(maxsize=64)
+            stop = threading.Event()
+            producer = threading.Thread(
+                target=self._produce_pages, args=(page_queue, stop), daemon=True
+            )
+            producer.start()
             
-            # Step 4: Extract metadata from chunks
-            logger.info("Step 4: Extracting metadata from chunks...")
-            for chunk in tqdm(all_chunks, desc="Extracting metadata"):
-                chunk["metadata"] = self.metadata_extractor.extract_metadata(
-                    chunk["text"],
-                    chunk
-                )
+            num_pages = 0
+            total_chunks = 0
+            pending_chunks = []
+            # Index-wide chunk ids; the store is empty at this point
+            next_chunk_id = 0
             
-            # Step 5: Generate embeddings
-            logger.info("Step 5: Generating embeddings...")
-            texts = [chunk["text"] for chunk in all_chunks]
-            embeddings = self.embedding_gen.embed_texts(texts)
+            try:
+                with self._progress_bar("Indexing pages") as progress:
+                    while True:
+                        page = page_queue.get()
+                        if page is _END_OF_PAGES:
+                            break
+                        if isinstance(page, Exception):
+                            raise page
+                        
+                        # Chunk the page semantically
+                        chunks = self.chunker.chunk_text(
+                            page["text"],
+                            metadata={
+                                "page_num": page["page_num"],
+                                "section": page["section"],
+                                "subsection": page["subsection"],
+                                "document_title": page["document_title"]
+                            }
+                        )
+                        
+                        # Extract metadata for the page's chunks in one batch
+                        metadatas = self.metadata_extractor.extract_metadata_batch(chunks)
+                        for chunk, metadata in zip(chunks, metadatas):
+                            chunk["chunk_id"] = next_chunk_id
+                            next_chunk_id += 1
+                            chunk["metadata"] = metadata
+                        
+                        pending_chunks.extend(chunks)
+                        num_pages += 1
+                        progress.update()
+                        
+                        if len(pending_chunks) >= settings.INDEX_FLUSH_SIZE:
+                            total_chunks += self._index_chunks(pending_chunks)
+                            pending_chunks = []
+                
+                if pending_chunks:
+                    total_chunks += self._index_chunks(pending_chunks)
+            finally:
+                stop.set()
+                producer.join()
             
-            # Step 6: Index in vector store
-            logger.info("Step 6: Indexing in vector store...")
-            self.vector_store.add_documents(all_chunks, embeddings)
+            # Metadata and the FAISS index are written once, not per batch
+            self.vector_store.finish_build()
+            self.retriever.refresh_index()
             
-            logger.info(f"Successfully indexed {len(all_chunks)} chunks")
+            logger.info(f"Successfully indexed {total_chunks} chunks from {num_pages} pages")
             return True
         
         except Exception as e:
             logger.error(f"Error building index: {e}")
+            # Roll back so a partial index is never served as complete
+            try:
+                self._reset_index()
+            except Exception as reset_error:
+                logger.error(f"Error discarding partial index: {reset_error}")
             return False
     
+    def _reset_index(self):
+        """Empty the vector store and drop the retriever's view of the old index"""
+        self.vector_store.reset()
+        self.retriever.refresh_index()
+    
+    @staticmethod
+    def _progress_bar(desc: str):
+        """Per-page progress bar, or a no-op if tqdm is not installed
+        
+        tqdm is imported here rather than at module load so serving the
+        pipeline does not pay for it.
+        
+        Args:
+            desc: Progress bar label
+            
+        Returns:
+            Context manager yielding an object with update()
+        """
+        try:
+            from tqdm import tqdm
+        except ImportError:
+            return nullcontext(SimpleNamespace(update=lambda n=1: None))
+        return tqdm(desc=desc, unit="page", mininterval=1.0)
+    
+    def _produce_pages(self, page_queue: queue.Queue, stop: threading.Event):
+        """Extract and clean PDF pages, feeding them to build_index
+        
+        Pages are extracted and cleaned in batches on one pool of NUM_WORKERS
+        processes. Errors are forwarded through the queue; the stream always
+        ends with _END_OF_PAGES.
+        
+        Args:
+            page_queue: Queue to put cleaned pages on
+            stop: Set by the consumer when it stops reading
+        """
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    page_queue.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        num_workers = settings.NUM_WORKERS
+        batch_size = max(1, num_workers * 16)
+        
+        try:
+            # Regex cleaning holds the GIL, so parallel cleaning uses processes;
+            # the parser's extraction pool is reused rather than starting a second
+            pool = self.pdf_parser.worker_pool(num_workers) if num_workers > 1 else nullcontext()
+            with pool as executor:
+                def flush(batch: List[Dict[str, Any]]) -> bool:
+                    texts = [page["text"] for page in batch]
+                    if executor is not None and len(texts) > 1:
+                        cleaned = executor.map(TextCleaner.preprocess_for_chunking, texts)
+                    else:
+                        cleaned = map(self.text_cleaner.preprocess_for_chunking, texts)
+                    
+                    for page, text in zip(batch, cleaned):
+                        page["text"] = text
+                        if not put(page):
+                            return False
+                    return True
+                
+                batch = []
+                for page in self.pdf_parser.iter_pages_with_metadata(executor):
+                    batch.append(page)
+                    if len(batch) >= batch_size:
+                        if not flush(batch):
+                            return
+                        batch = []
+                
+                if batch and not flush(batch):
+                    return
+        
+        except Exception as e:
+            put(e)
+            return
+        
+        put(_END_OF_PAGES)
+    
+    def _index_chunks(self, chunks: List[Dict[str, Any]]) -> int:
+        """Embed a batch of chunks and add them to the vector store
+        
+        Args:
+            chunks: Chunk dictionaries with text and metadata
+            
+        Returns:
+            Number of chunks indexed
+        """
+        texts = [chunk["text"] for chunk in chunks]
+        embeddings = self.embedding_gen.embed_texts(
+            texts,
+            batch_size=settings.INDEX_EMBEDDING_BATCH_SIZE,
+            dtype=settings.EMBEDDING_DTYPE
+        )
+        if not self.vector_store.add_documents(chunks, embeddings, persist=False):
+            raise RuntimeError(f"Vector store rejected a batch of {len(chunks)} chunks")
+        
+        logger.info(f"Indexed batch of {len(chunks)} chunks")
+        return len(chunks)
+    
     def answer_query(self, query: str, include_retrieved_docs: bool = False) -> Dict[str, Any]:
         """Answer a user query using the RAG pipeline
         
@@ -228,30 +443,23 @@ class RAGPipeline:
     def log_interaction(self, query: str, answer: str, session_id: str = None):
         """Log a chat interaction
         
+        The row is queued and written by the background log writer.
+        
         Args:
             query: User query
             answer: Generated answer
             session_id: Optional session ID
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO chat_history (session_id, query, answer, model, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
+            self._log_queue.put((_INSERT_INTERACTION, (
                 session_id or "default",
                 query,
                 answer,
                 settings.LLM_MODEL,
                 datetime.now()
-            ))
+            )))
             
-            conn.commit()
-            conn.close()
-            
-            logger.debug("Interaction logged successfully")
+            logger.debug("Interaction queued for logging")
         
         except Exception as e:
             logger.warning(f"Error logging interaction: {e}")
@@ -259,6 +467,8 @@ class RAGPipeline:
     def log_feedback(self, query: str, answer: str, rating: int, comment: str = None):
         """Log user feedback on answer quality
         
+        The row is queued and written by the background log writer.
+        
         Args:
             query: Original query
             answer: Generated answer
@@ -266,16 +476,7 @@ class RAGPipeline:
             comment: Optional comment
         """
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO feedback (query, answer, rating, comment, timestamp)
-                VALUES (?, ?, ?, ?, ?)
-            """, (query, answer, rating, comment, datetime.now()))
-            
-            conn.commit()
-            conn.close()
+            self._log_queue.put((_INSERT_FEEDBACK, (query, answer, rating, comment, datetime.now())))
             
             logger.info(f"Feedback logged: rating={rating}")
         
@@ -2,7 +2,10 @@
 Hybrid retrieval combining dense, sparse, and metadata filtering
 """
 import logging
+import hashlib
+import functools
 from typing import List, Dict, Any, Tuple
+from pathlib import Path
 import numpy as np
 from config.settings import settings
 from src.embeddings import EmbeddingGenerator, VectorStore
@@ -22,28 +25,140 @@ class HybridRetriever:
         """
         self.embedding_gen = embedding_generator
         self.vector_store = vector_store
+        
+        # Per-instance query caches, cleared whenever the index changes. Only
+        # error-free results are cached: failures raise through the caches
+        self._cached_embed = functools.lru_cache(maxsize=1024)(self._embed_query)
+        self._cached_retrieve = functools.lru_cache(maxsize=1024)(self._retrieve_uncached)
+        
         self._build_bm25_index()
     
     def _build_bm25_index(self):
-        """Build BM25 sparse index from stored documents"""
+        """Build BM25 sparse index from stored documents
+        
+        The fitted vectorizer and matrix are cached on disk, keyed on the
+        store and a hash of the indexed texts and index parameters, so
+        restarts over an unchanged corpus skip the fit.
+        """
         try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
+            from sklearn.feature_extraction.text import CountVectorizer
+            import joblib
             
             # Load documents from metadata
             documents = list(self.vector_store.metadata_store.values())
             texts = [doc.get("text", "") for doc in documents]
             
-            if texts:
-                self.vectorizer = TfidfVectorizer(max_features=10000, stop_words='english')
-                self.tfidf_matrix = self.vectorizer.fit_transform(texts)
-                logger.info(f"Built BM25 index for {len(texts)} documents")
-            else:
+            if not texts:
                 self.vectorizer = None
-                self.tfidf_matrix = None
+                self.bm25_matrix = None
+                return
+            
+            vectorizer = CountVectorizer(max_features=10000, stop_words='english')
+            cache_path = self._bm25_cache_path(texts, vectorizer)
+            if cache_path.exists():
+                try:
+                    self.vectorizer, self.bm25_matrix = joblib.load(cache_path)
+                    logger.info(f"Loaded cached BM25 index for {len(texts)} documents")
+                    return
+                except Exception as e:
+                    logger.warning(f"Could not load cached BM25 index: {e}")
+            
+            self.vectorizer = vectorizer
+            self.bm25_matrix = self._bm25_weights(self.vectorizer.fit_transform(texts))
+            logger.info(f"Built BM25 index for {len(texts)} documents")
+            
+            try:
+                # Drop this store's caches for previous corpus versions
+                prefix = cache_path.name.rsplit("_", 1)[0]
+                for stale in cache_path.parent.glob(f"{prefix}_*.joblib"):
+                    if stale != cache_path and stale.name.rsplit("_", 1)[0] == prefix:
+                        stale.unlink()
+                joblib.dump((self.vectorizer, self.bm25_matrix), cache_path)
+            except Exception as e:
+                logger.warning(f"Could not cache BM25 index: {e}")
         except Exception as e:
             logger.warning(f"Could not build BM25 index: {e}")
             self.vectorizer = None
-            self.tfidf_matrix = None
+            self.bm25_matrix = None
+    
+    @staticmethod
+    def _bm25_weights(counts) -> Any:
+        """Turn a document-term count matrix into per-term BM25 weights
+        
+        Each stored entry becomes idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)),
+        so scoring a query is a single sparse matrix-vector product.
+        
+        Args:
+            counts: Sparse document-term count matrix
+            
+        Returns:
+            CSR matrix of BM25 term weights
+        """
+        k1, b = settings.BM25_K1, settings.BM25_B
+        
+        weights = counts.tocsr().astype(np.float64)
+        n_docs = weights.shape[0]
+        
+        doc_len = np.asarray(weights.sum(axis=1)).ravel()
+        avgdl = doc_len.mean() or 1.0
+        
+        df = np.bincount(weights.indices, minlength=weights.shape[1])
+        idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        
+        tf = weights.data
+        row_len = np.repeat(doc_len, np.diff(weights.indptr))
+        weights.data = idf[weights.indices] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * row_len / avgdl))
+        
+        return weights
+    
+    def _bm25_cache_path(self, texts: List[str], vectorizer: Any) -> Path:
+        """Get the BM25 cache file for a corpus
+        
+        Args:
+            texts: Indexed document texts, in index order
+            vectorizer: Unfitted vectorizer the index is built with
+            
+        Returns:
+            Cache file path named after the store and collection, keyed on
+            the corpus content and index parameters
+        """
+        params = sorted(vectorizer.get_params().items())
+        digest = hashlib.sha1(f"bm25:{settings.BM25_K1}:{settings.BM25_B}:{params!r}".encode("utf-8"))
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+        
+        store = f"{self.vector_store.store_type.lower()}_{self.vector_store.collection_name}"
+        return settings.DATA_DIR / f"bm25_{store}_{digest.hexdigest()}.joblib"
+    
+    def refresh_index(self):
+        """Rebuild the sparse index after documents are added to the vector store"""
+        self._build_bm25_index()
+        self.clear_cache()
+    
+    def clear_cache(self):
+        """Drop cached query embeddings and retrieval results"""
+        self._cached_embed.cache_clear()
+        self._cached_retrieve.cache_clear()
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query, returning a read-only vector safe to share from the cache
+        
+        Args:
+            query: Query string
+            
+        Returns:
+            Query embedding
+            
+        Raises:
+            ValueError: If the embedding is the all-zero fallback of a failed
+                encode, so it is not cached
+        """
+        embedding = self.embedding_gen.embed_text(query)
+        if not np.any(embedding):
+            raise ValueError("Query embedding failed")
+        embedding.setflags(write=False)
+        return embedding
     
     def retrieve(self, query: str, k: int = None, filters: Dict[str, Any] = None) -> List[Tuple[Dict[str, Any], float]]:
         """Retrieve relevant documents using hybrid search
@@ -58,17 +173,78 @@ class HybridRetriever:
         """
         k = k or settings.RETRIEVAL_K
         
+        if not settings.CACHE_EMBEDDINGS:
+            return self._retrieve_uncached(query, k, filters)
+        
+        try:
+            filters_key = frozenset(filters.items()) if filters else None
+        except TypeError:
+            # Unhashable filter values, skip the cache
+            return self._retrieve_uncached(query, k, filters)
+        
+        try:
+            return list(self._cached_retrieve(query, k, filters_key, False))
+        except Exception as e:
+            # Nothing was cached for the failed run; answer with whichever
+            # searches succeed, without caching the partial result
+            logger.error(f"Error in retrieval, retrying uncached: {e}")
+            return self._retrieve_uncached(query, k, filters)
+    
+    def _retrieve_uncached(self, query: str, k: int, filters=None,
+                           tolerate_errors: bool = True) -> List[Tuple[Dict[str, Any], float]]:
+        """Run hybrid retrieval without consulting the result cache
+        
+        Args:
+            query: Query string
+            k: Number of results to return
+            filters: Optional metadata filters, as a dict or frozenset of items
+            tolerate_errors: Treat a failed dense or sparse search as having no
+                results instead of raising
+            
+        Returns:
+            List of (document, relevance_score) tuples
+        """
+        if isinstance(filters, frozenset):
+            filters = dict(filters)
+        
         if not settings.USE_HYBRID_RETRIEVAL:
             # Use only dense retrieval
-            return self._dense_search(query, k, filters)
+            return self._run_search("dense", tolerate_errors, self._dense_search, query, k, filters)
         else:
             # Hybrid: combine dense, sparse, and metadata filtering
-            dense_results = self._dense_search(query, min(k * 2, settings.RETRIEVAL_K_MAX), filters)
-            sparse_results = self._sparse_search(query, min(k * 2, settings.RETRIEVAL_K_MAX))
+            dense_results = self._run_search(
+                "dense", tolerate_errors, self._dense_search,
+                query, min(k * 2, settings.RETRIEVAL_K_MAX), filters
+            )
+            sparse_results = self._run_search(
+                "sparse", tolerate_errors, self._sparse_search,
+                query, min(k * 2, settings.RETRIEVAL_K_MAX)
+            )
             
             # Aggregate results
             return self._aggregate_results(dense_results, sparse_results, k)
     
+    @staticmethod
+    def _run_search(name: str, tolerate_errors: bool, search, *args) -> List[Tuple[Dict[str, Any], float]]:
+        """Call a search method, optionally mapping its errors to no results
+        
+        Args:
+            name: Search name for the error log
+            tolerate_errors: Return [] on error instead of raising
+            search: Search method to call
+            *args: Arguments for the search method
+            
+        Returns:
+            List of (document, score) tuples
+        """
+        try:
+            return search(*args)
+        except Exception as e:
+            if not tolerate_errors:
+                raise
+            logger.error(f"Error in {name} search: {e}")
+            return []
+    
     def _dense_search(self, query: str, k: int, filters: Dict[str, Any] = None) -> List[Tuple[Dict[str, Any], float]]:
         """Dense similarity search using embeddings
         
@@ -80,25 +256,23 @@ class HybridRetriever:
         Returns:
             List of (document, similarity_score) tuples
         """
-        try:
+        if settings.CACHE_EMBEDDINGS:
+            query_embedding = self._cached_embed(query)
+        else:
             query_embedding = self.embedding_gen.embed_text(query)
-            results = self.vector_store.search(query_embedding, k, filters)
-            
-            # Filter by threshold
-            results = [
-                (doc, score) for doc, score in results
-                if score >= settings.SIMILARITY_THRESHOLD
-            ]
-            
-            logger.info(f"Dense search returned {len(results)} results for query: {query[:50]}")
-            return results
+        results = self.vector_store.search(query_embedding, k, filters, raise_errors=True)
         
-        except Exception as e:
-            logger.error(f"Error in dense search: {e}")
-            return []
+        # Filter by threshold
+        results = [
+            (doc, score) for doc, score in results
+            if score >= settings.SIMILARITY_THRESHOLD
+        ]
+        
+        logger.info(f"Dense search returned {len(results)} results for query: {query[:50]}")
+        return results
     
     def _sparse_search(self, query: str, k: int) -> List[Tuple[Dict[str, Any], float]]:
-        """Sparse keyword search using BM25/TF-IDF
+        """Sparse keyword search using BM25
         
         Args:
             query: Query string
@@ -107,30 +281,29 @@ class HybridRetriever:
         Returns:
             List of (document, similarity_score) tuples
         """
-        if not self.vectorizer or self.tfidf_matrix is None:
+        if not self.vectorizer or self.bm25_matrix is None:
             return []
         
-        try:
-            query_vector = self.vectorizer.transform([query])
-            scores = (query_vector * self.tfidf_matrix.T).toarray()[0]
-            
-            # Get top k indices
-            top_indices = np.argsort(-scores)[:k]
-            top_scores = scores[top_indices]
-            
-            results = []
-            for idx, score in zip(top_indices, top_scores):
-                if score > 0 and idx < len(self.vector_store.metadata_store):
-                    doc = self.vector_store.metadata_store.get(str(idx))
-                    if doc:
-                        results.append((doc, float(score)))
-            
-            logger.info(f"Sparse search returned {len(results)} results for query: {query[:50]}")
-            return results
+        query_vector = self.vectorizer.transform([query])
+        scores = self.bm25_matrix.dot(query_vector.T).toarray().ravel()
         
-        except Exception as e:
-            logger.error(f"Error in sparse search: {e}")
-            return []
+        # Get top k indices: partial selection, then sort only those k
+        if k < len(scores):
+            top_indices = np.argpartition(-scores, k)[:k]
+            top_indices = top_indices[np.argsort(-scores[top_indices])]
+        else:
+            top_indices = np.argsort(-scores)
+        top_scores = scores[top_indices]
+        
+        results = []
+        for idx, score in zip(top_indices, top_scores):
+            if score > 0 and idx < len(self.vector_store.metadata_store):
+                doc = self.vector_store.metadata_store.get(str(idx))
+                if doc:
+                    results.append((doc, float(score)))
+        
+        logger.info(f"Sparse search returned {len(results)} results for query: {query[:50]}")
+        return results
     
     def _aggregate_results(self, dense_results: List[Tuple[Dict[str, Any], float]],
                           sparse_results: List[Tuple[Dict[str, Any], float]],
@@ -145,34 +318,45 @@ class HybridRetriever:
         Returns:
             Combined and aggregated results
         """
-        # Create combined ranking using RRF (Reciprocal Rank Fusion)
+        # Create combined ranking using RRF (Reciprocal Rank Fusion). Only
+        # ranks are fused: cosine and TF-IDF scores are not on a common scale
+        rrf_k = settings.RRF_K
         result_scores = {}
+        doc_by_key = {}
         
-        # Score from dense search (normalized)
-        for rank, (doc, score) in enumerate(dense_results):
-            doc_key = doc.get("text", "")[:100]  # Use text as key
-            rrf_score = 1.0 / (60 + rank)  # RRF formula
-            result_scores[doc_key] = result_scores.get(doc_key, 0) + rrf_score * score
+        # Score from dense search
+        for rank, (doc, _) in enumerate(dense_results):
+            doc_key = self._doc_key(doc)
+            doc_by_key.setdefault(doc_key, doc)
+            result_scores[doc_key] = result_scores.get(doc_key, 0) + 1.0 / (rrf_k + rank)
         
-        # Score from sparse search (normalized)
-        for rank, (doc, score) in enumerate(sparse_results):
-            doc_key = doc.get("text", "")[:100]
-            rrf_score = 1.0 / (60 + rank)
-            result_scores[doc_key] = result_scores.get(doc_key, 0) + rrf_score * score
+        # Score from sparse search
+        for rank, (doc, _) in enumerate(sparse_results):
+            doc_key = self._doc_key(doc)
+            doc_by_key.setdefault(doc_key, doc)
+            result_scores[doc_key] = result_scores.get(doc_key, 0) + 1.0 / (rrf_k + rank)
         
         # Sort by aggregated score
         sorted_results = sorted(result_scores.items(), key=lambda x: x[1], reverse=True)
         
         # Return top k with original documents
-        final_results = []
-        for doc_key, agg_score in sorted_results[:k]:
-            # Find the document
-            for doc, _ in dense_results + sparse_results:
-                if doc.get("text", "")[:100] == doc_key:
-                    final_results.append((doc, agg_score))
-                    break
-        
-        return final_results[:k]
+        return [(doc_by_key[doc_key], agg_score) for doc_key, agg_score in sorted_results[:k]]
+    
+    @staticmethod
+    def _doc_key(doc: Dict[str, Any]) -> Any:
+        """Get the fusion key identifying a document chunk
+        
+        Args:
+            doc: Document dictionary from dense or sparse search
+            
+        Returns:
+            Key that is equal for the same chunk across both result lists
+        """
+        chunk_id = doc.get("chunk_id")
+        if chunk_id is not None:
+            # Index-wide id assigned in build_index; Chroma returns it as str
+            return int(chunk_id)
+        return f"{doc.get('source', '')}:{hash(doc.get('text', ''))}"
     
     def retrieve_with_metadata_filter(self, query: str, filter_key: str, filter_value: str, k: int = None) -> List[Tuple[Dict[str, Any], float]]:
         """Retrieve with specific metadata filtering
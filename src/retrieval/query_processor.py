@@ -2,66 +2,233 @@
 Query processing, understanding, and expansion
 """
 import logging
+import functools
 import re
+import threading
 from typing import List, Dict, Any, Tuple
 from collections import Counter
 import spacy
+from spacy.matcher import Matcher
+from spacy.util import filter_spans
+from spacy.attrs import IS_ALPHA, IS_STOP, LENGTH, LOWER
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Token attributes read by _extract_keywords_from_doc
+_KEYWORD_ATTRS = [IS_STOP, IS_ALPHA, LENGTH, LOWER]
+
+# Token patterns for statute references: 18 U.S.C. § 2113(a), § 2113.1, Section 5, Title 18.
+# The tokenizer splits "2113(a)" into "2113(a" and ")", so a number ending in an
+# open subsection must be followed by the closing parenthesis token
+_STATUTE_NUMBERS = (
+    [{"TEXT": {"REGEX": r"^§?\d+(?:\.\d+)?(?:\([A-Za-z0-9]+\))*$"}}],
+    [{"TEXT": {"REGEX": r"^§?\d+(?:\.\d+)?(?:\([A-Za-z0-9]+\))*\([A-Za-z0-9]+$"}}, {"ORTH": ")"}],
+)
+_STATUTE_PREFIXES = (
+    [{"LIKE_NUM": True, "OP": "?"}, {"LOWER": {"IN": ["u.s.c.", "u.s.c", "usc"]}}, {"TEXT": "§", "OP": "?"}],
+    [{"TEXT": "§"}],
+    [{"LOWER": {"IN": ["section", "title"]}}],
+)
+_LAW_PATTERNS = [prefix + number for prefix in _STATUTE_PREFIXES for number in _STATUTE_NUMBERS]
+
+# "U.S.C." spelling variants: USC, U.S.C, U. S. C., ...
+_USC_RE = re.compile(r"U\.?\s?S\.?\s?C\.?")
+
+# Question words that already make a query read as a question
+_QWORD_RE = re.compile(r"what|where|when|who|which", re.IGNORECASE)
+
+# spaCy pipeline shared by every QueryProcessor, created on first use
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def _get_nlp():
+    """Create the query spaCy pipeline once per process
+    
+    Queries only need tokenization and lexical attributes (stopwords,
+    punctuation, lowercase forms), so a blank English pipeline is used
+    instead of a statistical model.
+    
+    Returns:
+        Shared spaCy Language
+    """
+    global _nlp
+    
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = spacy.blank("en")
+    
+    return _nlp
+
+
+def _index_intent_keywords(intent_types: Dict[str, Tuple[str, ...]]) -> Tuple[Tuple[str, int], ...]:
+    """Invert intent -> keywords into unique (keyword, intent bitmask) pairs
+    
+    Bit i of a keyword's mask is set when the keyword belongs to the i-th
+    intent of intent_types.
+    
+    Args:
+        intent_types: Mapping of intent name to its keywords
+        
+    Returns:
+        Tuple of (keyword, intent bitmask), in first-seen order
+    """
+    index: Dict[str, int] = {}
+    for bit, keywords in enumerate(intent_types.values()):
+        for keyword in keywords:
+            index[keyword] = index.get(keyword, 0) | (1 << bit)
+    
+    return tuple(index.items())
+
 
 class QueryProcessor:
     """Process and understand user queries for legal documents"""
     
-    # Legal keywords that often appear in queries
-    LEGAL_KEYWORDS = {
-        "punishment", "sentence", "fine", "prison", "crime", "guilty",
-        "offense", "violation", "charged", "convicted", "imprisoned",
-        "robbery", "theft", "assault", "fraud", "murder", "penalty"
+    INTENT_TYPES = {
+        "punishment": ("what", "how", "sentence", "penalty", "fine", "prison"),
+        "crime_definition": ("what", "define", "is", "criminal", "offense"),
+        "elements": ("element", "requires", "must", "need", "necessary"),
+        "exceptions": ("except", "unless", "provided", "exclude"),
+        "references": ("cite", "section", "statute", "usc", "code"),
     }
     
-    INTENT_TYPES = {
-        "punishment": ["what", "how", "sentence", "penalty", "fine", "prison"],
-        "crime_definition": ["what", "define", "is", "criminal", "offense"],
-        "elements": ["element", "requires", "must", "need", "necessary"],
-        "exceptions": ["except", "unless", "provided", "exclude"],
-        "references": ["cite", "section", "statute", "usc", "code"],
+    # Each distinct keyword with a bitmask of the intents it scores for, so a
+    # keyword shared by several intents (e.g. "what") is searched for only once
+    _INTENT_NAMES = tuple(INTENT_TYPES)
+    _INTENT_KEYWORDS = _index_intent_keywords(INTENT_TYPES)
+    
+    # Terms swapped for a legal equivalent to form an extra query variation
+    EXPANSION_TERMS = {
+        "robbery": "18 U.S.C. § 2113",
+        "theft": "larceny",
     }
     
+    # All expansion terms as whole words, matched in a single scan
+    _EXPANSION_RE = re.compile(
+        r"\b(?:" + "|".join(map(re.escape, EXPANSION_TERMS)) + r")\b",
+        re.IGNORECASE
+    )
+    
     def __init__(self):
         """Initialize query processor"""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            logger.warning("SpaCy model not found")
-            self.nlp = None
+        self.nlp = _get_nlp()
+        self._expansion_enabled = bool(settings.QUERY_EXPANSION_ENABLED)
+        self._law_matcher = Matcher(self.nlp.vocab)
+        self._law_matcher.add("LAW", _LAW_PATTERNS)
+        
+        # Processing is deterministic per query string, so repeats are served
+        # from an in-process cache
+        self._cached_process = functools.lru_cache(maxsize=4096)(self._process_query_frozen)
     
     def process_query(self, query: str) -> Dict[str, Any]:
         """Process and analyze a user query
         
+        Results are cached per query string in an immutable form; every call
+        returns a new dictionary, so callers may modify it freely.
+        
+        Args:
+            query: User query string
+            
+        Returns:
+            Dictionary with processed query information
+        """
+        processed = dict(self._cached_process(query))
+        if "entities" in processed:
+            processed["entities"] = tuple(dict(entity) for entity in processed["entities"])
+        return processed
+    
+    def clear_cache(self):
+        """Drop cached query processing results"""
+        self._cached_process.cache_clear()
+    
+    def process_queries(self, queries: List[str], batch_size: int = 64) -> List[Dict[str, Any]]:
+        """Process many queries, parsing them with spaCy in batches
+        
+        Intended for bulk work such as evaluation runs; results are not
+        added to the process_query cache.
+        
+        Args:
+            queries: User query strings
+            batch_size: Number of queries per spaCy batch
+            
+        Returns:
+            One processed query dictionary per input, in input order
+        """
+        cleaned = [self._clean_query(query) if query and query.strip() else "" for query in queries]
+        docs = self.nlp.pipe(cleaned, batch_size=batch_size)
+        
+        return [
+            self._build_processed(query, clean, doc)
+            for query, clean, doc in zip(queries, cleaned, docs)
+        ]
+    
+    def _process_query_frozen(self, query: str) -> Tuple[Tuple[str, Any], ...]:
+        """Process a query into the immutable form kept in the cache
+        
+        Args:
+            query: User query string
+            
+        Returns:
+            Items of the processed query dictionary, with each entity
+            dictionary stored as a tuple of its items
+        """
+        processed = self._process_query_uncached(query)
+        if "entities" in processed:
+            processed["entities"] = tuple(tuple(entity.items()) for entity in processed["entities"])
+        return tuple(processed.items())
+    
+    def _process_query_uncached(self, query: str) -> Dict[str, Any]:
+        """Process and analyze a user query without the cache
+        
+        Args:
+            query: User query string
+            
+        Returns:
+            Dictionary with processed query information
+        """
+        if not query or len(query.strip()) == 0:
+            return {"original": query, "expanded": ()}
+        
+        cleaned = self._clean_query(query)
+        
+        # Parse once; keywords, entities and expansion all share this doc
+        doc = self.nlp(cleaned)
+        
+        return self._build_processed(query, cleaned, doc)
+    
+    def _build_processed(self, query: str, cleaned: str, doc: Any) -> Dict[str, Any]:
+        """Assemble the processed query dictionary from a parsed query
+        
         Args:
             query: User query string
+            cleaned: Cleaned query
+            doc: Parsed spaCy doc of the cleaned query
             
         Returns:
             Dictionary with processed query information
         """
         if not query or len(query.strip()) == 0:
-            return {"original": query, "expanded": []}
+            return {"original": query, "expanded": ()}
+        
+        keywords = tuple(self._extract_keywords_from_doc(doc, cleaned))
         
         processed = {
             "original": query,
-            "cleaned": self._clean_query(query),
-            "keywords": self._extract_keywords(query),
-            "intent": self._classify_intent(query),
-            "entities": self._extract_entities(query),
-            "expanded_queries": self._expand_query(query) if settings.QUERY_EXPANSION_ENABLED else [],
+            "cleaned": cleaned,
+            "keywords": keywords,
+            "intent": self._classify_intent(query.lower()),
+            "entities": tuple(self._extract_entities_from_doc(doc)),
+            "expanded_queries": tuple(self._expand_query(query, keywords)) if self._expansion_enabled else (),
         }
         
         logger.info(f"Processed query: {query} -> Intent: {processed['intent']}")
         return processed
     
-    def _clean_query(self, query: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def _clean_query(query: str) -> str:
         """Clean and normalize query
         
         Args:
@@ -70,114 +237,109 @@ class QueryProcessor:
         Returns:
             Cleaned query
         """
-        # Remove extra whitespace
-        query = " ".join(query.split())
-        
-        # Normalize common patterns
-        query = re.sub(r"U\.?\s?S\.?\s?C\.?", "U.S.C.", query)
-        query = re.sub(r"§", "§", query)
+        # Remove extra whitespace and normalize common patterns
+        query = _USC_RE.sub("U.S.C.", " ".join(query.split()))
         
         return query.strip()
     
-    def _extract_keywords(self, query: str) -> List[str]:
-        """Extract keywords from query
+    def _extract_keywords_from_doc(self, doc: Any, query: str) -> List[str]:
+        """Extract keywords from a parsed query
         
         Args:
-            query: Query text
+            doc: Parsed spaCy doc of the query
+            query: Query text, split on whitespace as the fallback
             
         Returns:
             List of keywords
         """
-        if not self.nlp:
-            return query.lower().split()
-        
-        doc = self.nlp(query)
-        keywords = []
+        # Read the token attributes into one array instead of per-token
+        # property access, then keep non-stopword words longer than two
+        # characters. Requiring alphabetic tokens stands in for the old
+        # NOUN/PROPN/VERB filter: numbers, punctuation and citation
+        # fragments such as "u.s.c." or "2113(a" are dropped
+        attrs = doc.to_array(_KEYWORD_ATTRS)
+        mask = (attrs[:, 0] == 0) & (attrs[:, 1] == 1) & (attrs[:, 2] > 2)
         
-        for token in doc:
-            # Include nouns, proper nouns, and verbs
-            if token.pos_ in ["NOUN", "PROPN", "VERB"] and len(token.text) > 2:
-                if not token.is_stop:
-                    keywords.append(token.text.lower())
+        strings = doc.vocab.strings
+        keywords = {strings[lower] for lower in attrs[mask, 3].tolist()}
         
-        return list(set(keywords)) or query.lower().split()
+        return list(keywords) or query.lower().split()
     
-    def _classify_intent(self, query: str) -> str:
+    @classmethod
+    @functools.lru_cache(maxsize=2048)
+    def _classify_intent(cls, query_lower: str) -> str:
         """Classify query intent (punishment, crime definition, etc.)
         
         Args:
-            query: Query text
+            query_lower: Lowercased query text
             
         Returns:
             Intent classification
         """
-        query_lower = query.lower()
-        scores = {}
+        scores = [0] * len(cls._INTENT_NAMES)
         
-        for intent, keywords in self.INTENT_TYPES.items():
-            score = sum(1 for kw in keywords if kw in query_lower)
-            scores[intent] = score
+        for keyword, bits in cls._INTENT_KEYWORDS:
+            if keyword in query_lower:
+                # Credit every intent whose bit is set, lowest bit first
+                while bits:
+                    low = bits & -bits
+                    scores[low.bit_length() - 1] += 1
+                    bits ^= low
         
-        # Return intent with highest score, or "general"
-        if max(scores.values()) > 0:
-            return max(scores, key=scores.get)
-        else:
-            return "general"
+        # Return intent with highest score (first wins ties), or "general"
+        best_intent, best_score = "general", 0
+        for intent, score in zip(cls._INTENT_NAMES, scores):
+            if score > best_score:
+                best_intent, best_score = intent, score
+        
+        return best_intent
     
-    def _extract_entities(self, query: str) -> List[Dict[str, str]]:
-        """Extract named entities from query
+    def _extract_entities_from_doc(self, doc: Any) -> List[Dict[str, str]]:
+        """Extract statute references (LAW entities) from a parsed query
         
         Args:
-            query: Query text
+            doc: Parsed spaCy doc of the query
             
         Returns:
             List of entities
         """
-        if not self.nlp:
-            return []
-        
-        doc = self.nlp(query)
-        entities = []
+        # Keep the longest match where patterns overlap ("18 U.S.C. § 2113"
+        # rather than also "§ 2113")
+        spans = filter_spans(self._law_matcher(doc, as_spans=True))
         
-        for ent in doc.ents:
-            if ent.label_ in ["PERSON", "ORG", "LAW"]:
-                entities.append({
-                    "text": ent.text,
-                    "type": ent.label_
-                })
-        
-        return entities
+        return [{"text": span.text, "type": span.label_} for span in spans]
     
-    def _expand_query(self, query: str) -> List[str]:
+    def _expand_query(self, query: str, keywords: List[str]) -> List[str]:
         """Expand query with related terms and legal references
         
         Args:
             query: Original query
+            keywords: Keywords already extracted from the query
             
         Returns:
             List of expanded query variations
         """
-        expanded = []
+        expanded = set()  # Duplicates collapse as variations are added
         
         # Expansion 1: Add "law" context
-        expanded.append(f"{query} law")
-        expanded.append(f"{query} statute")
-        expanded.append(f"{query} legal")
-        
-        # Expansion 2: Replace common abbreviations
-        if "robbery" in query.lower():
-            expanded.append(query.replace("robbery", "18 U.S.C. § 2113"))
+        expanded.add(f"{query} law")
+        expanded.add(f"{query} statute")
+        expanded.add(f"{query} legal")
         
-        if "theft" in query.lower():
-            expanded.append(query.replace("theft", "larceny"))
+        # Expansion 2: Replace common terms with their legal equivalents
+        replaced = self._EXPANSION_RE.sub(
+            lambda match: self.EXPANSION_TERMS[match.group(0).lower()], query
+        )
+        if replaced != query:
+            expanded.add(replaced)
         
         # Expansion 3: Add legal terms
-        keywords = self._extract_keywords(query)
         if keywords:
-            expanded.append(" ".join(keywords) + " punishment")
-            expanded.append(" ".join(keywords) + " offense")
+            terms = " ".join(keywords)
+            expanded.add(f"{terms} punishment")
+            expanded.add(f"{terms} offense")
         
-        return list(set(expanded))  # Remove duplicates
+        return list(expanded)
 
 
 class QueryReformulator:
@@ -197,8 +359,7 @@ class QueryReformulator:
         query = query.rstrip("?!.")
         
         # Convert to complete sentence form if needed
-        if not query.endswith(("is", "are", "was", "were")):
-            if not any(query.lower().startswith(w) for w in ["what", "where", "when", "who", "which"]):
-                query = f"information about {query}"
+        if not query.endswith(("is", "are", "was", "were")) and not _QWORD_RE.match(query):
+            query = f"information about {query}"
         
         return query
@@ -0,0 +1,21 @@
+"""
+Tests for CitationHandler citation extraction
+"""
+import pytest
+
+from src.generation.citation_handler import CitationHandler
+
+
+@pytest.mark.parametrize("text, reference", [
+    ("18 U.S.C. § 2113(a)", "2113(a)"),
+    ("18 U.S.C. §\xa02113(a)", "2113(a)"),
+    ("18\xa0U.S.C.\xa0§\xa02113", "2113"),
+])
+def test_extract_usc_citation(text, reference):
+    citations = CitationHandler.extract_citations(text)
+    assert [c["reference"] for c in citations] == [reference]
+
+
+def test_extract_cfr_citation_with_nbsp():
+    citations = CitationHandler.extract_citations("28\xa0C.F.R.\xa0§\xa050.10")
+    assert [c["statute"] for c in citations] == ["28 C.F.R. § 50.10"]
@@ -0,0 +1,90 @@
+"""
+Tests for HybridRetriever result caching
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from config.settings import settings
+from src.embeddings import VectorStore
+from src.retrieval import HybridRetriever
+
+
+class _FlakyEmbeddings:
+    """Returns the zero-vector fallback of a failed encode for the first `failures` queries"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+
+    def embed_text(self, text):
+        if self.failures:
+            self.failures -= 1
+            return np.zeros(4, dtype=np.float32)
+        return np.ones(4, dtype=np.float32) / 2
+
+    def embed_texts(self, texts, **kwargs):
+        return [np.ones(4, dtype=np.float32) / 2 for _ in texts]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "VECTOR_STORE_PATH", tmp_path)
+    monkeypatch.setattr(settings, "CACHE_EMBEDDINGS", True)
+
+    store = VectorStore(store_type="faiss", collection_name="test")
+    docs = [{"text": f"page {i}", "chunk_id": i} for i in range(2)]
+    store.add_documents(docs, _FlakyEmbeddings().embed_texts([doc["text"] for doc in docs]))
+    return store
+
+
+def test_failed_embedding_is_not_cached(store):
+    # Both the cached attempt and its uncached retry fail
+    retriever = HybridRetriever(_FlakyEmbeddings(failures=2), store)
+
+    assert retriever.retrieve("q") == []
+    assert [doc["text"] for doc, _ in retriever.retrieve("q")] == ["page 0", "page 1"]
+
+
+def test_failed_store_search_is_not_cached(store, monkeypatch):
+    retriever = HybridRetriever(_FlakyEmbeddings(), store)
+    search = store.search
+    failures = [2]
+
+    def flaky_search(*args, **kwargs):
+        if failures[0]:
+            failures[0] -= 1
+            raise RuntimeError("store unavailable")
+        return search(*args, **kwargs)
+
+    monkeypatch.setattr(store, "search", flaky_search)
+
+    assert retriever.retrieve("q") == []
+    assert [doc["text"] for doc, _ in retriever.retrieve("q")] == ["page 0", "page 1"]
+
+
+def test_bm25_caches_are_per_collection(store, tmp_path):
+    embeddings = _FlakyEmbeddings()
+    other = VectorStore(store_type="faiss", collection_name="other")
+    other.add_documents([{"text": "wire fraud"}], embeddings.embed_texts(["wire fraud"]))
+
+    HybridRetriever(embeddings, store)
+    HybridRetriever(embeddings, other)
+    assert len(list(tmp_path.glob("bm25_faiss_test_*.joblib"))) == 1
+    assert len(list(tmp_path.glob("bm25_faiss_other_*.joblib"))) == 1
+
+    # A new corpus version replaces only its own collection's cache
+    store.add_documents([{"text": "bank robbery"}], embeddings.embed_texts(["bank robbery"]))
+    HybridRetriever(embeddings, store)
+    assert len(list(tmp_path.glob("bm25_faiss_test_*.joblib"))) == 1
+    assert len(list(tmp_path.glob("bm25_faiss_other_*.joblib"))) == 1
+
+
+def test_bm25_cache_key_includes_vectorizer_params(store):
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    retriever = HybridRetriever(_FlakyEmbeddings(), store)
+    texts = ["page 0", "page 1"]
+    assert retriever._bm25_cache_path(texts, CountVectorizer(max_features=10)) != \
+        retriever._bm25_cache_path(texts, CountVectorizer(max_features=20))
@@ -0,0 +1,55 @@
+"""
+Tests for RAGPipeline.build_index rollback
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+from config.settings import settings
+from src.embeddings import VectorStore
+from src.pipeline import RAGPipeline
+from src.retrieval import HybridRetriever
+
+
+class _StubEmbeddings:
+    """Embeds every text to the same unit vector"""
+
+    def embed_text(self, text):
+        return np.ones(4, dtype=np.float32) / 2
+
+    def embed_texts(self, texts, **kwargs):
+        return [self.embed_text(text) for text in texts]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(settings, "VECTOR_STORE_PATH", tmp_path)
+
+    embeddings = _StubEmbeddings()
+    store = VectorStore(store_type="faiss", collection_name="test")
+    docs = [{"text": f"page {i}", "chunk_id": i} for i in range(2)]
+    store.add_documents(docs, embeddings.embed_texts([doc["text"] for doc in docs]))
+
+    # Skip __init__: only the components build_index touches are needed
+    pipeline = RAGPipeline.__new__(RAGPipeline)
+    pipeline.embedding_gen = embeddings
+    pipeline.vector_store = store
+    pipeline.retriever = HybridRetriever(embeddings, store)
+    return pipeline
+
+
+def test_failed_rebuild_clears_retriever(pipeline):
+    assert [doc["text"] for doc, _ in pipeline.retriever.retrieve("q")] == ["page 0", "page 1"]
+
+    def fail(page_queue, stop):
+        page_queue.put(RuntimeError("PDF could not be read"))
+
+    pipeline._produce_pages = fail
+
+    assert pipeline.build_index(force_rebuild=True) is False
+    assert pipeline.vector_store.get_collection_size() == 0
+    assert not pipeline.vector_store.build_interrupted()
+    assert pipeline.retriever.bm25_matrix is None
+    assert pipeline.retriever.retrieve("q") == []
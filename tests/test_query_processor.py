@@ -0,0 +1,60 @@
+"""
+Tests for QueryProcessor statute reference extraction
+"""
+import pytest
+
+from src.retrieval.query_processor import QueryProcessor
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return QueryProcessor()
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("18 U.S.C. § 2113(a)", ["18 U.S.C. § 2113(a)"]),
+    ("18 U.S.C. 1343(b)", ["18 U.S.C. 1343(b)"]),
+    ("Section 2113(d)", ["Section 2113(d)"]),
+    ("§ 2113(a)(1) and §2113", ["§ 2113(a)(1)", "§2113"]),
+    ("penalty under 18 USC 1001", ["18 U.S.C. 1001"]),
+    ("(see § 2113)", ["§ 2113"]),
+    ("what is robbery?", []),
+])
+def test_statute_entities(processor, query, expected):
+    entities = processor.process_query(query)["entities"]
+    assert [entity["text"] for entity in entities] == expected
+    assert all(entity["type"] == "LAW" for entity in entities)
+
+
+def test_cached_result_is_not_shared(processor):
+    first = processor.process_query("x robbery")
+    first["intent"] = "changed"
+    first["entities"] = ()
+    with pytest.raises(AttributeError):
+        first["keywords"].append("MUT")
+
+    second = processor.process_query("x robbery")
+    assert second is not first
+    assert second["intent"] != "changed"
+    assert "MUT" not in second["keywords"]
+    assert isinstance(second["keywords"], tuple)
+    assert isinstance(second["expanded_queries"], tuple)
+
+
+def test_cached_entities_are_copied(processor):
+    processor.process_query("§ 2113")["entities"][0]["text"] = "MUT"
+    assert processor.process_query("§ 2113")["entities"][0]["text"] == "§ 2113"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("penalty for bank robbery under 18 U.S.C. § 2113(a)", {"penalty", "bank", "robbery"}),
+    ("What is the sentence for wire fraud in 2020?", {"sentence", "wire", "fraud"}),
+])
+def test_keywords_are_words(processor, query, expected):
+    processed = processor.process_query(query)
+    assert set(processed["keywords"]) == expected
+
+    # Keyword-based expansions are built from words only
+    for expanded in processed["expanded_queries"]:
+        if expanded.endswith((" punishment", " offense")):
+            assert set(expanded.split()[:-1]) == expected
@@ -0,0 +1,40 @@
+"""
+Tests for RAGGenerator.generate_answer_batch error handling
+"""
+import asyncio
+from types import SimpleNamespace
+
+from src.generation.rag_generator import RAGGenerator
+
+
+def _completion(content):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=message)],
+        usage=SimpleNamespace(total_tokens=1),
+        model="stub",
+    )
+
+
+class _StubCompletions:
+    """Answers, returns no content, or is cancelled depending on the query"""
+
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][1]["content"]
+        if "cancelled" in prompt:
+            raise asyncio.CancelledError()
+        if "empty" in prompt:
+            return _completion(None)
+        return _completion("See 18 U.S.C. § 2113")
+
+
+def test_batch_falls_back_per_query():
+    generator = RAGGenerator.__new__(RAGGenerator)
+    generator.async_client = SimpleNamespace(chat=SimpleNamespace(completions=_StubCompletions()))
+
+    queries = [("answered", []), ("empty", []), ("cancelled", [])]
+    results = asyncio.run(generator.generate_answer_batch(queries))
+
+    assert results[0]["answer"] == "See 18 U.S.C. § 2113"
+    for (query, docs), result in zip(queries[1:], results[1:]):
+        assert result == generator._generate_fallback_answer(query, docs)
@@ -0,0 +1,66 @@
+"""
+Differential tests for TextCleaner.preprocess_for_chunking against the
+original clean_text -> remove_artifacts -> normalize_legal_references chain
+"""
+import random
+import re
+
+import pytest
+
+from src.ingestion.text_cleaner import TextCleaner
+
+
+def _reference_preprocess(text: str) -> str:
+    """Original uncompiled three-step pipeline"""
+    if not text:
+        return ""
+
+    # clean_text
+    text = re.sub(r"\f", " ", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    text = re.sub(r"\n\s*\n", "\n\n", text)
+    text = re.sub(r"^\s*\d+\s*", "", text, flags=re.MULTILINE)
+    text = text.strip()
+
+    # remove_artifacts
+    text = re.sub(r"https?://\S+", "", text)
+    text = re.sub(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", "", text)
+    text = "".join(char for char in text if ord(char) >= 32 or char in "\n\t")
+
+    # normalize_legal_references
+    text = re.sub(r"U\.?\s?S\.?\s?C\.?", "U.S.C.", text)
+    text = re.sub(r"&sect;|Sec\.|Section", "§", text)
+    text = re.sub(r"et\s*seq\.?", "et seq.", text)
+
+    return text
+
+
+@pytest.mark.parametrize("text", [
+    "fined under this title \n18 U.S.C. 2113",
+    "fined under this title\n18 U.S.C. 2113",
+    "12 Section 2113(a)\n  13 Whoever, by force,\x0c14 takes",
+    "See USC § 1343 et  seq and http://example.com/x or a@b.org ",
+    "\x00\x07text\r\nwith\tcontrol\x1fchars",
+    "",
+])
+def test_preprocess_matches_reference(text):
+    assert TextCleaner.preprocess_for_chunking(text) == _reference_preprocess(text)
+
+
+def test_preprocess_keeps_number_after_trailing_space():
+    result = TextCleaner.preprocess_for_chunking("fined under this title \n18 U.S.C. 2113")
+    assert "18 U.S.C. 2113" in result
+
+
+def test_preprocess_matches_reference_fuzz():
+    rng = random.Random(1234)
+    alphabet = [
+        " ", "  ", "\n", " \n", "\n\n", "\f", "\t", "\r", "\x00",
+        "1", "18", "2113", "(a)", "§", "U", "S", "C", ".", "U.S.C.", "USC",
+        "Sec.", "Section", "&sect;", "et", "seq", "et seq", "x", "fine",
+        "http://a.b/c", "a@b.org",
+    ]
+
+    for _ in range(20000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert TextCleaner.preprocess_for_chunking(text) == _reference_preprocess(text), repr(text)